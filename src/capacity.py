@@ -0,0 +1,82 @@
+import dataclasses
+import typing as tp
+
+import numpy as np
+
+from src import models
+from src.settings import settings
+
+
+@dataclasses.dataclass
+class CapacityProjection:
+    cpu_load: np.ndarray
+    ram_load: np.ndarray
+    offline: np.ndarray
+    cost: np.ndarray
+
+
+class CapacitySimulator:
+    def __init__(
+        self,
+        prices: tp.List[models.Price],
+        cpu_request: float,
+        ram_request: float,
+        cpu_overhead: float,
+        ram_overhead: float,
+    ) -> None:
+        self.prices: tp.List[models.Price] = prices
+        self.cpu = np.array([price.cpu for price in prices], dtype=np.float64)
+        self.ram = np.array([price.ram for price in prices], dtype=np.float64)
+        self.cost = np.array([price.cost for price in prices], dtype=np.float64)
+        self.cpu_request: float = cpu_request
+        self.ram_request: float = ram_request
+        self.cpu_overhead: float = cpu_overhead
+        self.ram_overhead: float = ram_overhead
+        self._index: tp.Dict[tp.Tuple[int, int], int] = {
+            (price.cpu, price.ram): index for index, price in enumerate(prices)
+        }
+
+    def counts(
+        self, fleets: tp.Sequence[tp.Sequence[tp.Union[models.Price, models.GetResource]]]
+    ) -> np.ndarray:
+        result = np.zeros((len(fleets), len(self.prices)), dtype=np.float64)
+        for row, pods in enumerate(fleets):
+            for pod in pods:
+                result[row, self._index[(pod.cpu, pod.ram)]] += 1
+        return result
+
+    def evaluate(
+        self,
+        counts: np.ndarray,
+        requests: tp.Union[float, tp.Sequence[float], np.ndarray],
+        max_load: tp.Optional[float] = None,
+    ) -> CapacityProjection:
+        counts = np.atleast_2d(np.asarray(counts, dtype=np.float64))
+        requests = np.atleast_1d(np.asarray(requests, dtype=np.float64))
+        max_load = settings.max_load if max_load is None else max_load
+
+        pods = counts.sum(axis=1)[:, None]
+        cpu = (counts @ self.cpu)[:, None]
+        ram = (counts @ self.ram)[:, None]
+        need_cpu = requests[None, :] * self.cpu_request + pods * self.cpu_overhead
+        need_ram = requests[None, :] * self.ram_request + pods * self.ram_overhead
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cpu_load = np.where(cpu > 0, need_cpu / cpu * 100, np.inf)
+            ram_load = np.where(ram > 0, need_ram / ram * 100, np.inf)
+        return CapacityProjection(
+            cpu_load=cpu_load,
+            ram_load=ram_load,
+            offline=(cpu_load >= max_load) | (ram_load >= max_load),
+            cost=counts @ self.cost,
+        )
+
+    def served(self, counts: np.ndarray, load_cap: float) -> np.ndarray:
+        counts = np.atleast_2d(np.asarray(counts, dtype=np.float64))
+        pods = counts.sum(axis=1)
+        cpu = counts @ (load_cap * self.cpu) - pods * self.cpu_overhead
+        ram = counts @ (load_cap * self.ram) - pods * self.ram_overhead
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cpu = np.where(self.cpu_request > 0, cpu / self.cpu_request, np.inf)
+            ram = np.where(self.ram_request > 0, ram / self.ram_request, np.inf)
+        return np.minimum(cpu, ram)
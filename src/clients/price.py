@@ -1,5 +1,7 @@
+import asyncio
 import httpx
 import logging
+import time
 import typing as tp
 
 from urllib.parse import urljoin
@@ -17,23 +19,49 @@ PriceType = tp.Dict[models.ResourceType, tp.List[models.Price]]
 class PriceClient:
     URL: str = "/api/price"
 
+    _http_client: httpx.AsyncClient
+
+    def __init__(self, http_client: httpx.AsyncClient) -> None:
+        self._http_client: httpx.AsyncClient = http_client
+        self._lock: asyncio.Lock = asyncio.Lock()
+        self._fetched_at: float = 0
+        self.prices: tp.Optional[PriceType] = None
+
     @map_result
     async def get(self) -> tp.List[models.Price]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url=urljoin(settings.host, self.URL))
-            if response.is_success:
-                logger.info(f"Success get prices. Body: {response.json()}")
-                return response.json()
+        response = await self._http_client.get(url=urljoin(settings.host, self.URL))
+        if response.is_success:
+            logger.info("Success get prices.")
+            logger.debug("Body: %s", response.text)
+            return response.json()
 
-            logger.error(
-                f"Failed get prices. status: {response.status_code} body: {response.text}"
-            )
-            raise RuntimeError("Failed get prices")
+        logger.error(
+            f"Failed get prices. status: {response.status_code} body: {response.text}"
+        )
+        raise RuntimeError("Failed get prices")
 
     async def get_grouped_prices(self) -> PriceType:
-        current_price = await self.get()
+        async with self._lock:
+            if (
+                self.prices is not None
+                and time.monotonic() - self._fetched_at < settings.price_cache_second
+            ):
+                return self.prices
+            return await self._fetch_grouped_prices()
+
+    async def _fetch_grouped_prices(self) -> PriceType:
+        try:
+            current_price = await self.get()
+        except Exception:
+            if self.prices is None:
+                raise
+            logger.warning("Use cached prices.")
+            return self.prices
+
         result: PriceType = {}
 
         for item in current_price:
             result.setdefault(item.type, []).append(item)
+        self.prices = result
+        self._fetched_at = time.monotonic()
         return result
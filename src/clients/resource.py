@@ -5,80 +5,103 @@ import typing as tp
 from urllib.parse import urljoin
 
 from src import models
+from src.exceptions import TransientError
 from src.utils import map_result
 from src.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
+def _error(response: httpx.Response, message: str) -> RuntimeError:
+    if response.status_code == 429 or response.status_code >= 500:
+        return TransientError(message)
+    return RuntimeError(message)
+
+
 class ResourceClient:
     URL: str = "/api/resource"
 
+    _http_client: httpx.AsyncClient
+    _token: str
+
+    def __init__(
+        self, http_client: httpx.AsyncClient, token: tp.Optional[str] = None
+    ) -> None:
+        self._http_client: httpx.AsyncClient = http_client
+        self._token: str = token or settings.token
+
     @map_result
     async def get(self) -> tp.List[models.GetResource]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url=urljoin(settings.host, self.URL), params=self._params,
-            )
-            if response.is_success:
-                logger.info(f"Success get resources list. Body: {response.json()}")
-                return response.json()
-
-            logger.error(
-                f"Failed get resources list. Status: {response.status_code} Body: {response.text}"
-            )
-            raise RuntimeError("Failed get resources list.")
+        response = await self._request(
+            "GET", url=urljoin(settings.host, self.URL), params=self._params,
+        )
+        if response.is_success:
+            logger.info("Success get resources list.")
+            logger.debug("Body: %s", response.text)
+            return response.json()
+
+        logger.error(
+            f"Failed get resources list. Status: {response.status_code} Body: {response.text}"
+        )
+        raise _error(response, "Failed get resources list.")
 
     @map_result
     async def delete(self, item_id: int) -> None:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                url=urljoin(settings.host, f"{self.URL}/{item_id}"),
-                params=self._params,
-            )
-            if response.is_success:
-                logger.info(f"Success delete resource by id: {item_id}")
-                return None
-
-            logger.error(
-                f"Failed delete resource by id: {item_id}."
-                f"Status: {response.status_code} Body: {response.text}"
-            )
-            raise RuntimeError("Failed delete resource")
+        response = await self._request(
+            "DELETE",
+            url=urljoin(settings.host, f"{self.URL}/{item_id}"),
+            params=self._params,
+        )
+        if response.is_success:
+            logger.info(f"Success delete resource by id: {item_id}")
+            return None
+
+        logger.error(
+            f"Failed delete resource by id: {item_id}."
+            f"Status: {response.status_code} Body: {response.text}"
+        )
+        raise _error(response, "Failed delete resource")
 
     async def put(self, item_id: int, body: models.PostResource) -> None:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                url=urljoin(settings.host, f"{self.URL}/{item_id}"),
-                params=self._params,
-                json=body.model_dump(mode="json"),
-            )
-            if response.is_success:
-                logger.info(f"Success put resource by id: {item_id}")
-                return None
-
-            logger.error(
-                f"Failed put resource by id: {item_id}."
-                f"Status: {response.status_code} Body: {response.text}"
-            )
-            raise RuntimeError("Failed delete resource")
+        response = await self._request(
+            "PUT",
+            url=urljoin(settings.host, f"{self.URL}/{item_id}"),
+            params=self._params,
+            json=body.model_dump(mode="json"),
+        )
+        if response.is_success:
+            logger.info(f"Success put resource by id: {item_id}")
+            return None
+
+        logger.error(
+            f"Failed put resource by id: {item_id}."
+            f"Status: {response.status_code} Body: {response.text}"
+        )
+        raise _error(response, "Failed put resource")
 
     async def post(self, body: models.PostResource) -> None:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url=urljoin(settings.host, self.URL),
-                params=self._params,
-                json=body.model_dump(mode="json"),
-            )
-            if response.is_success:
-                logger.info("Success create resource.")
-                return None
-
-            logger.error(
-                f"Failed create resource. Status: {response.status_code} Body: {response.text}"
-            )
-            raise RuntimeError("Failed create resource")
+        response = await self._request(
+            "POST",
+            url=urljoin(settings.host, self.URL),
+            params=self._params,
+            json=body.model_dump(mode="json"),
+        )
+        if response.is_success:
+            logger.info("Success create resource.")
+            return None
+
+        logger.error(
+            f"Failed create resource. Status: {response.status_code} Body: {response.text}"
+        )
+        raise _error(response, "Failed create resource")
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        try:
+            return await self._http_client.request(method, url, **kwargs)
+        except httpx.TransportError as exc:
+            logger.error(f"Failed request {method} {url}: {exc!r}")
+            raise TransientError(f"Failed request {method} {url}") from exc
 
     @property
     def _params(self):
-        return {"token": settings.token}
+        return {"token": self._token}
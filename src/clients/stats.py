@@ -14,21 +14,30 @@ logger = logging.getLogger(__name__)
 class StatsClient:
     URL: str = "/api/statistic"
 
+    _http_client: httpx.AsyncClient
+    _token: str
+
+    def __init__(
+        self, http_client: httpx.AsyncClient, token: tp.Optional[str] = None
+    ) -> None:
+        self._http_client: httpx.AsyncClient = http_client
+        self._token: str = token or settings.token
+
     @map_result
     async def get(self) -> tp.Optional[models.Stat]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url=urljoin(settings.host, self.URL), params=self._params,
-            )
-            if response.is_success:
-                logger.info(f"Success get stats. Body: {response.json()}")
-                return response.json()
-
-            logger.error(
-                f"Failed get stats. Status: {response.status_code} Body: {response.text}"
-            )
-            return None
+        response = await self._http_client.get(
+            url=urljoin(settings.host, self.URL), params=self._params,
+        )
+        if response.is_success:
+            logger.info("Success get stats.")
+            logger.debug("Body: %s", response.text)
+            return response.json()
+
+        logger.error(
+            f"Failed get stats. Status: {response.status_code} Body: {response.text}"
+        )
+        return None
 
     @property
     def _params(self):
-        return {"token": settings.token}
+        return {"token": self._token}
@@ -0,0 +1,60 @@
+import math
+import typing as tp
+
+import numpy as np
+
+
+class RecursiveLeastSquares:
+    def __init__(
+        self,
+        prior: tp.Sequence[float],
+        forgetting: float,
+        huber: float,
+        prior_variance: float = 1e3,
+    ) -> None:
+        size = len(prior)
+        self.theta = np.array(prior, dtype=np.float64)
+        self.covariance = np.eye(size) * prior_variance
+        self.forgetting: float = forgetting
+        self.huber: float = huber
+
+        self.count: int = 0
+        self._residual_sum: float = 0.0
+        self._weight_sum: float = 0.0
+
+    def update(self, x: tp.Sequence[float], y: float) -> float:
+        x = np.asarray(x, dtype=np.float64)
+        residual = y - float(x @ self.theta)
+
+        weight = 1.0
+        if self.count > len(self.theta):
+            scale = self.huber * math.sqrt(self.residual_variance)
+            if scale > 0 and abs(residual) > scale:
+                weight = scale / abs(residual)
+
+        px = self.covariance @ x
+        gain = px / (self.forgetting / weight + float(x @ px))
+        self.theta = self.theta + gain * residual
+        self.covariance = (self.covariance - np.outer(gain, px)) / self.forgetting
+
+        self._residual_sum = self.forgetting * self._residual_sum + weight * residual ** 2
+        self._weight_sum = self.forgetting * self._weight_sum + weight
+        self.count += 1
+        return residual
+
+    def predict(self, x: tp.Sequence[float]) -> float:
+        return float(np.asarray(x, dtype=np.float64) @ self.theta)
+
+    @property
+    def residual_variance(self) -> float:
+        if self._weight_sum <= 0:
+            return 0.0
+        return self._residual_sum / self._weight_sum
+
+    def confidence_interval(self, z: float = 1.96) -> tp.List[tp.Tuple[float, float]]:
+        variance = np.clip(np.diag(self.covariance), 0, None) * self.residual_variance
+        error = z * np.sqrt(variance)
+        return [
+            (float(value - delta), float(value + delta))
+            for value, delta in zip(self.theta, error)
+        ]
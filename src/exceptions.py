@@ -0,0 +1,2 @@
+class TransientError(RuntimeError):
+    pass
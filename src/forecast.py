@@ -0,0 +1,101 @@
+import math
+import statistics
+import typing as tp
+
+import numpy as np
+
+from src.settings import settings
+
+
+Forecast = tp.Tuple[tp.List[float], tp.List[float]]
+
+
+class Forecaster:
+    name: str = ""
+
+    def forecast(self, values: tp.Sequence[float], horizon: int) -> Forecast:
+        raise NotImplementedError
+
+
+class NaiveForecaster(Forecaster):
+    name = "naive"
+
+    def forecast(self, values: tp.Sequence[float], horizon: int) -> Forecast:
+        diffs = np.diff(values)
+        sigma = float(np.std(diffs)) if len(diffs) else 0.0
+        return (
+            [float(values[-1])] * horizon,
+            [sigma * math.sqrt(step + 1) for step in range(horizon)],
+        )
+
+
+class MovingAverageForecaster(Forecaster):
+    name = "moving_average"
+
+    def forecast(self, values: tp.Sequence[float], horizon: int) -> Forecast:
+        window = values[-settings.forecast_window:]
+        sigma = statistics.pstdev(window) * math.sqrt(1 + 1 / len(window))
+        return [statistics.fmean(window)] * horizon, [sigma] * horizon
+
+
+class HoltForecaster(Forecaster):
+    name = "holt"
+
+    def __init__(self, alpha: float = 0.5, beta: float = 0.1) -> None:
+        self.alpha: float = alpha
+        self.beta: float = beta
+
+    def forecast(self, values: tp.Sequence[float], horizon: int) -> Forecast:
+        if len(values) < 3:
+            raise ValueError("Not enough data for holt")
+
+        level, trend = float(values[0]), float(values[1] - values[0])
+        residuals = []
+        for value in values[1:]:
+            residuals.append(value - (level + trend))
+            previous = level
+            level = self.alpha * value + (1 - self.alpha) * (level + trend)
+            trend = self.beta * (level - previous) + (1 - self.beta) * trend
+
+        sigma = math.sqrt(statistics.fmean(r * r for r in residuals))
+        means, stds, spread = [], [], 1.0
+        for step in range(1, horizon + 1):
+            means.append(level + step * trend)
+            stds.append(sigma * math.sqrt(spread))
+            spread += (self.alpha * (1 + step * self.beta)) ** 2
+        return means, stds
+
+
+class ArimaForecaster(Forecaster):
+    name = "arima"
+
+    ALPHA = 0.05
+
+    def forecast(self, values: tp.Sequence[float], horizon: int) -> Forecast:
+        from pmdarima import auto_arima
+
+        train = np.asarray(values, dtype=np.float64)
+        model = auto_arima(
+            train, trace=False, error_action="ignore", suppress_warnings=True
+        )
+        model.fit(train)
+
+        result, conf_int = model.predict(
+            n_periods=horizon, return_conf_int=True, alpha=self.ALPHA
+        )
+        z = statistics.NormalDist().inv_cdf(1 - self.ALPHA / 2)
+        return (
+            [float(value) for value in result],
+            [max(float(high - low) / (2 * z), 0.0) for low, high in conf_int],
+        )
+
+
+FORECASTERS: tp.Dict[str, tp.Type[Forecaster]] = {
+    item.name: item
+    for item in (
+        ArimaForecaster,
+        HoltForecaster,
+        MovingAverageForecaster,
+        NaiveForecaster,
+    )
+}
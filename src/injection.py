@@ -1,9 +1,12 @@
 from typing import Type, TypeVar
 
+import httpx
+
 from injector import Injector, singleton
 
-from src.clients.stats import StatsClient
-from src.services.stats import StatsService
+from src.clients.price import PriceClient
+from src.settings import settings
+from src.workers import WorkerPool
 
 
 injector = Injector()
@@ -15,5 +18,14 @@ def on(dependency_class: Type[T]) -> T:
 
 
 async def configure():
-    service = StatsService(StatsClient())
-    injector.binder.bind(StatsService, to=service, scope=singleton)
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=settings.http_max_connections),
+        timeout=settings.http_timeout_second,
+    )
+    injector.binder.bind(httpx.AsyncClient, to=http_client, scope=singleton)
+    injector.binder.bind(
+        PriceClient, to=PriceClient(http_client), scope=singleton,
+    )
+    injector.binder.bind(
+        WorkerPool, to=WorkerPool(settings.workers), scope=singleton,
+    )
@@ -0,0 +1,148 @@
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+import typing as tp
+
+from src.settings import settings
+
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(funcName)s: %(lineno)d - %(message)s"
+
+
+def message_kind(record: logging.LogRecord) -> str:
+    if isinstance(record.msg, str) and record.msg.startswith("#"):
+        return record.msg.split(":", 1)[0]
+    return f"{record.name}:{record.lineno}"
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        sample: tp.Dict[str, float],
+        exempt: tp.Iterable[str] = (),
+    ) -> None:
+        super().__init__()
+        self.rate: float = rate
+        self.burst: int = burst
+        self.sample: tp.Dict[str, float] = sample
+        self.exempt: tp.Set[str] = set(exempt)
+        self._tokens: tp.Dict[str, tp.Tuple[float, float]] = {}
+        self._suppressed: tp.Dict[str, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        kind = message_kind(record)
+        record.kind = kind
+        if (
+            record.levelno >= logging.WARNING
+            or kind in self.exempt
+            or record.name in self.exempt
+        ):
+            return True
+
+        with self._lock:
+            if random.random() >= self.sample.get(kind, 1.0) or not self._take(kind):
+                self._suppressed[kind] = self._suppressed.get(kind, 0) + 1
+                return False
+            record.suppressed = self._suppressed.pop(kind, 0)
+        return True
+
+    def flush(self) -> tp.Dict[str, int]:
+        with self._lock:
+            suppressed, self._suppressed = self._suppressed, {}
+        return suppressed
+
+    def _take(self, kind: str) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        tokens, updated_at = self._tokens.get(kind, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        if tokens < 1:
+            self._tokens[kind] = (tokens, now)
+            return False
+        self._tokens[kind] = (tokens - 1, now)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "func": record.funcName,
+            "line": record.lineno,
+            "kind": getattr(record, "kind", None) or message_kind(record),
+            "message": record.getMessage(),
+        }
+        if getattr(record, "suppressed", 0):
+            data["suppressed"] = record.suppressed
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class LogListener(logging.handlers.QueueListener):
+    def __init__(
+        self,
+        records: queue.SimpleQueue,
+        handler: logging.Handler,
+        limiter: RateLimitFilter,
+    ) -> None:
+        super().__init__(records, handler, respect_handler_level=True)
+        self.limiter: RateLimitFilter = limiter
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return None
+        super().stop()
+        for kind, count in self.limiter.flush().items():
+            record = logging.LogRecord(
+                __name__,
+                logging.INFO,
+                __file__,
+                0,
+                "#suppressed: kind = [%s], count = [%s]",
+                (kind, count),
+                None,
+                func="stop",
+            )
+            record.kind, record.suppressed = kind, count
+            for handler in self.handlers:
+                handler.handle(record)
+
+
+def configure_logging() -> LogListener:
+    handler = logging.StreamHandler(sys.stderr)
+    if settings.log_json:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    limiter = RateLimitFilter(
+        settings.log_rate, settings.log_burst, settings.log_sample, settings.log_exempt
+    )
+    queue_handler.addFilter(limiter)
+
+    root = logging.getLogger()
+    for item in list(root.handlers):
+        root.removeHandler(item)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level.upper())
+
+    listener = LogListener(records, handler, limiter)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
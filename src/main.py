@@ -1,55 +1,54 @@
 import asyncio
 import logging
-import sys
 import warnings
 
-from src.clients.resource import ResourceClient
-from src.clients.price import PriceClient
-from src.services.predict import PredictService
+import httpx
 
-from src.services.resource import ResourceService
-from src.services.scheduler import SchedulerService
-from src.services.stats import StatsService
+from src import startup
+from src.clients.price import PriceClient
 from src.settings import settings
 from src.injection import configure, on
+from src.logs import configure_logging
+from src.tenant import Tenant
+from src.workers import WorkerPool
 
 
 warnings.filterwarnings("ignore")
 
-logging.basicConfig(
-    stream=sys.stderr,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(funcName)s: %(lineno)d - %(message)s",
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
 async def main() -> None:
+    startup.report_startup()
+    warm_up_task = None
+    if settings.warm_up:
+        warm_up_task = asyncio.create_task(startup.warm_up_background())
+
     await configure()
 
-    price_client = PriceClient()
-    resource_client = ResourceClient()
-
-    resource_service = ResourceService(
-        price_client=price_client, resource_client=resource_client,
-    )
-    stat_service = on(StatsService)
-
-    scheduler_service = SchedulerService(
-        resource_service=resource_service,
-        price_client=price_client,
-        stat_service=stat_service,
-        predict_service=PredictService(stat_service),
-    )
-    if not settings.prod:
-        stat_service.load_memory()
-
-    while True:
-        try:
-            await scheduler_service.task()
-        except Exception as exc:
-            logging.error(f"Task failed: {exc}")
-        await asyncio.sleep(settings.sleep_second)
+    tokens = settings.tenant_tokens
+    tenants = [
+        Tenant(
+            token=token,
+            http_client=on(httpx.AsyncClient),
+            price_client=on(PriceClient),
+            workers=on(WorkerPool),
+        )
+        for token in tokens
+    ]
+    logger.info(f"Tenants: {[tenant.name for tenant in tenants]}")
+
+    try:
+        await asyncio.gather(
+            *(
+                tenant.run(delay=index * settings.sleep_second / len(tenants))
+                for index, tenant in enumerate(tenants)
+            )
+        )
+    finally:
+        if warm_up_task is not None:
+            warm_up_task.cancel()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+import math
+import typing as tp
+
+
+class RollingStats:
+    def __init__(self, size: int, alpha: float) -> None:
+        self.size: int = size
+        self.alpha: float = alpha
+
+        self._values: tp.List[float] = [0.0] * size
+        self._index: int = 0
+        self.count: int = 0
+        self._sum: float = 0.0
+        self._sum_sq: float = 0.0
+
+        self.ewma: tp.Optional[float] = None
+        self.ewm_var: float = 0.0
+
+    def push(self, value: float) -> None:
+        if self.count == self.size:
+            old = self._values[self._index]
+            self._sum -= old
+            self._sum_sq -= old * old
+        else:
+            self.count += 1
+
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self.size
+        self._sum += value
+        self._sum_sq += value * value
+        if self._index == 0:
+            self._sum = math.fsum(self._values[: self.count])
+            self._sum_sq = math.fsum(v * v for v in self._values[: self.count])
+
+        if self.ewma is None:
+            self.ewma = value
+            return None
+        diff = value - self.ewma
+        increment = self.alpha * diff
+        self.ewma += increment
+        self.ewm_var = (1 - self.alpha) * (self.ewm_var + diff * increment)
+
+    @property
+    def is_full(self) -> bool:
+        return self.count == self.size
+
+    @property
+    def last(self) -> tp.Optional[float]:
+        if not self.count:
+            return None
+        return self._values[self._index - 1]
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        if not self.count:
+            return 0.0
+        return max(self._sum_sq / self.count - self.mean ** 2, 0.0)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def volatility(self, floor: float = 0.1) -> float:
+        if self.ewma is None:
+            return 0.0
+        return math.sqrt(self.ewm_var) / max(abs(self.ewma), floor)
+
+    def relative_diff(self, value: float, floor: float = 0.1) -> float:
+        avg = max(self.mean, floor)
+        return abs((avg - value) / avg)
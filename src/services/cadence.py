@@ -0,0 +1,65 @@
+import logging
+
+from src import models
+
+from src.services.fleet import FleetState
+from src.services.scheduler import SchedulerService
+from src.services.stats import StatsService
+from src.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class CadencePolicy:
+    def __init__(
+        self,
+        stats_service: StatsService,
+        scheduler_service: SchedulerService,
+        fleet_state: FleetState,
+    ) -> None:
+        self._stats_service: StatsService = stats_service
+        self._scheduler_service: SchedulerService = scheduler_service
+        self._fleet_state: FleetState = fleet_state
+
+    def interval(self) -> float:
+        if not settings.adaptive_sleep:
+            return settings.sleep_second
+
+        stat = self._stats_service.get_last_stat()
+        if stat is None:
+            return settings.min_sleep_second
+
+        headroom = settings.max_load - max(
+            stat.vm_cpu_load, stat.vm_ram_load, stat.db_cpu_load, stat.db_ram_load
+        )
+        volatility = max(
+            self._scheduler_service.volatility(models.ResourceType.VM),
+            self._scheduler_service.volatility(models.ResourceType.DB),
+        )
+
+        calm = min(max(headroom / settings.cadence_headroom, 0.0), 1.0)
+        calm /= 1 + volatility / settings.cadence_volatility
+        interval = settings.min_sleep_second + calm * (
+            settings.max_sleep_second - settings.min_sleep_second
+        )
+
+        now = self._fleet_state.now()
+        ready = [
+            (item.ready_at - now).total_seconds()
+            for item in self._fleet_state.operations
+            if item.ready_at > now
+        ]
+        if ready:
+            interval = min(interval, min(ready))
+        interval = max(interval, settings.min_sleep_second)
+
+        logger.info(
+            "#cadence: headroom = [%.1f], volatility = [%.3f], "
+            "in flight = [%s], interval = [%.1f]",
+            headroom,
+            volatility,
+            len(ready),
+            interval,
+        )
+        return interval
@@ -0,0 +1,147 @@
+import logging
+import os
+import pickle
+import tempfile
+import time
+import typing as tp
+
+from src.clients.price import PriceClient
+from src.services.fleet import FleetState
+from src.services.latency import LatencyService
+from src.services.predict import PredictService
+from src.services.scheduler import SchedulerService
+from src.services.stats import StatsService
+from src.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointService:
+    VERSION: int = 7
+
+    _stats_service: StatsService
+    _predict_service: PredictService
+    _scheduler_service: SchedulerService
+    _fleet_state: FleetState
+    _latency_service: LatencyService
+    _price_client: PriceClient
+
+    def __init__(
+        self,
+        stats_service: StatsService,
+        predict_service: PredictService,
+        scheduler_service: SchedulerService,
+        fleet_state: FleetState,
+        latency_service: LatencyService,
+        price_client: PriceClient,
+        path: tp.Optional[str] = None,
+    ) -> None:
+        self._stats_service: StatsService = stats_service
+        self._predict_service: PredictService = predict_service
+        self._scheduler_service: SchedulerService = scheduler_service
+        self._fleet_state: FleetState = fleet_state
+        self._latency_service: LatencyService = latency_service
+        self._price_client: PriceClient = price_client
+        self.path: str = path or settings.checkpoint_path
+        self._saved_at: float = 0
+        self._saved_version: int = 0
+
+    def maybe_save(self) -> None:
+        if (
+            time.time() - self._saved_at < settings.checkpoint_second
+            and self._fleet_state.version == self._saved_version
+        ):
+            return None
+        try:
+            self.save()
+        except Exception as exc:
+            logger.error(f"Failed save checkpoint: {exc}")
+
+    def save(self) -> None:
+        version = self._fleet_state.version
+        state = {
+            "version": self.VERSION,
+            "saved_at": time.time(),
+            "stats": self._stats_service.dump_state(),
+            "predict": self._predict_service.dump_state(),
+            "scheduler": self._scheduler_service.dump_state(),
+            "fleet": self._fleet_state.dump_state(),
+            "latency": self._latency_service.dump_state(),
+            "prices": self._price_client.prices,
+        }
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self._saved_at = state["saved_at"]
+        self._saved_version = version
+        logger.info(f"Checkpoint saved: {self.path}")
+
+    def _load(self) -> tp.Optional[tp.Dict[str, tp.Any]]:
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as exc:
+            logger.error(f"Failed load checkpoint: {exc}")
+            return None
+
+        if state.get("version") != self.VERSION:
+            logger.warning(f"Skip checkpoint with version: {state.get('version')}")
+            return None
+        return state
+
+    def restore(self) -> bool:
+        state = self._load()
+        if state is None:
+            return False
+
+        age = time.time() - state["saved_at"]
+        if state["prices"]:
+            self._price_client.prices = state["prices"]
+
+        if age > settings.checkpoint_max_age_second:
+            logger.warning(f"Skip stale checkpoint. Age: {age:.0f}s")
+            return False
+
+        self._stats_service.load_state(state["stats"])
+        self._predict_service.load_state(state["predict"])
+        self._fleet_state.load_state(state["fleet"])
+        self._latency_service.load_state(state["latency"])
+        if age <= settings.checkpoint_history_age_second:
+            self._scheduler_service.load_state(state["scheduler"])
+
+        logger.info(
+            f"Checkpoint restored. Age: {age:.0f}s, "
+            f"memory size: {len(self._stats_service.memory)}"
+        )
+        return True
+
+    def restore_fleet(self) -> bool:
+        state = self._load()
+        if state is None:
+            return False
+
+        age = time.time() - state["saved_at"]
+        if age > settings.checkpoint_max_age_second:
+            logger.warning(f"Skip stale fleet checkpoint. Age: {age:.0f}s")
+            return False
+
+        self._fleet_state.load_state(state["fleet"])
+        logger.info(
+            f"Fleet state restored. Age: {age:.0f}s, "
+            f"in flight: {len(self._fleet_state.operations)}"
+        )
+        return True
@@ -0,0 +1,224 @@
+import asyncio
+import dataclasses
+import datetime
+import logging
+import typing as tp
+
+from src import models
+from src import utils
+
+from src.clients.price import PriceClient
+from src.services.fleet import FleetState
+from src.services.mutation import Mutation, MutationExecutor
+from src.services.predict import PredictService
+from src.services.resource import ResourceService
+from src.services.scheduler import SchedulerService
+from src.services.stats import StatsService
+from src.settings import settings
+from src.snapshot import FleetSnapshot
+from src.workers import WorkerPool
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Migration:
+    resource_type: models.ResourceType
+    to_delete: tp.List[int]
+    started_at: datetime.datetime
+
+
+class ConsolidationService:
+    def __init__(
+        self,
+        price_client: PriceClient,
+        resource_service: ResourceService,
+        stats_service: StatsService,
+        predict_service: PredictService,
+        scheduler_service: SchedulerService,
+        mutation_executor: MutationExecutor,
+        fleet_state: FleetState,
+        workers: WorkerPool,
+    ) -> None:
+        self._price_client: PriceClient = price_client
+        self._resource_service: ResourceService = resource_service
+        self._stats_service: StatsService = stats_service
+        self._predict_service: PredictService = predict_service
+        self._scheduler_service: SchedulerService = scheduler_service
+        self._mutation_executor: MutationExecutor = mutation_executor
+        self._fleet_state: FleetState = fleet_state
+        self._workers: WorkerPool = workers
+
+        self.migrations: tp.Dict[models.ResourceType, Migration] = {}
+        self._stable: tp.Dict[models.ResourceType, int] = {}
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.consolidation_second)
+            try:
+                await self.check()
+            except Exception as exc:
+                logger.error(f"Consolidation failed: {exc}")
+
+    async def check(self) -> None:
+        prices = self._price_client.prices
+        if not self._resource_service.is_active or not prices:
+            return None
+
+        for resource_type, items in prices.items():
+            if resource_type in self.migrations:
+                async with self._fleet_state.lock:
+                    await self._finish(resource_type, self._snapshot())
+            elif self._is_stable(resource_type, self._snapshot()):
+                await self._start(resource_type, self._snapshot(), items)
+
+    def _snapshot(self) -> FleetSnapshot:
+        return FleetSnapshot(list(self._fleet_state.pods.values()))
+
+    def _is_stable(
+        self, resource_type: models.ResourceType, snapshot: FleetSnapshot
+    ) -> bool:
+        stable = (
+            snapshot.count(resource_type) > 0
+            and snapshot.active_count(resource_type) == snapshot.count(resource_type)
+            and not self._fleet_state.in_flight(resource_type)
+            and len(self._stats_service.memory) >= settings.min_memory_size
+            and max(snapshot.load(resource_type)) <= settings.consolidation_load
+            and self._scheduler_service.volatility(resource_type)
+            <= settings.consolidation_volatility
+        )
+        count = self._stable.get(resource_type, 0) + 1 if stable else 0
+        self._stable[resource_type] = count
+        return count >= settings.consolidation_ticks
+
+    def _peak_requests(self) -> float:
+        predict = self._predict_service
+        if predict.has_intervals:
+            return max(
+                predict.quantile(step, 1 - settings.offline_probability)
+                for step in range(len(predict.requests))
+            )
+        if predict.is_request_predicted:
+            return max(predict.requests)
+        stat = self._stats_service.get_last_stat()
+        return stat.requests if stat else 0
+
+    def _demand(
+        self, resource_type: models.ResourceType, snapshot: FleetSnapshot
+    ) -> tp.Tuple[float, float]:
+        cpu_overhead, ram_overhead = self._stats_service.get_overhead(resource_type)
+        cpu_request, ram_request = self._stats_service.get_request(resource_type)
+        used_cpu, used_ram = snapshot.abs_load(resource_type, cpu_overhead, ram_overhead)
+        requests = self._peak_requests()
+        return (
+            max(used_cpu, requests * cpu_request) / settings.pod_load_max_percent,
+            max(used_ram, requests * ram_request) / settings.pod_load_max_percent,
+        )
+
+    async def _start(
+        self,
+        resource_type: models.ResourceType,
+        snapshot: FleetSnapshot,
+        prices: tp.List[models.Price],
+    ) -> None:
+        pods = snapshot.pods(resource_type)
+        cpu_overhead, ram_overhead = self._stats_service.get_overhead(resource_type)
+        need_cpu, need_ram = self._demand(resource_type, snapshot)
+        target = await self._workers.run(
+            utils.choose_resource, prices, need_cpu, need_ram, cpu_overhead, ram_overhead
+        )
+        if not target or len(target) > len(pods):
+            return None
+
+        current_cost = snapshot.cost_total(resource_type)
+        saving = current_cost - sum(price.cost for price in target)
+        if saving <= current_cost * settings.consolidation_saving:
+            return None
+
+        to_create, to_delete = list(target), []
+        for pod in sorted(pods, key=lambda x: (x.cpu, x.ram), reverse=True):
+            match = next(
+                (
+                    price for price in to_create
+                    if (price.cpu, price.ram) == (pod.cpu, pod.ram)
+                ),
+                None,
+            )
+            if match is None:
+                to_delete.append(pod)
+            else:
+                to_create.remove(match)
+
+        overlap = sum(price.cost for price in to_create) * settings.boot_second / 60
+        if saving * settings.consolidation_payback_minute < overlap:
+            return None
+
+        async with self._fleet_state.lock:
+            current = {
+                pod.id
+                for pod in self._fleet_state.pods.values()
+                if pod.type == resource_type
+            }
+            if self._fleet_state.in_flight(resource_type) or current != {
+                pod.id for pod in pods
+            }:
+                return None
+
+            logger.info(
+                "#consolidate: type = [%s], cost = [%s -> %s], pods = [%s -> %s], "
+                "create = [%s], delete = [%s]",
+                resource_type,
+                current_cost,
+                current_cost - saving,
+                len(pods),
+                len(target),
+                len(to_create),
+                len(to_delete),
+            )
+            self._stable[resource_type] = 0
+            self.migrations[resource_type] = Migration(
+                resource_type, [pod.id for pod in to_delete], self._fleet_state.now()
+            )
+            if to_create:
+                report = await self._mutation_executor.execute(
+                    [Mutation.create(resource_type, price) for price in to_create],
+                    pods,
+                )
+                self._fleet_state.record(report)
+                if not report.succeeded:
+                    del self.migrations[resource_type]
+                return None
+            await self._finish(resource_type, snapshot)
+
+    async def _finish(
+        self, resource_type: models.ResourceType, snapshot: FleetSnapshot
+    ) -> None:
+        migration = self.migrations[resource_type]
+        if self._fleet_state.in_flight(resource_type):
+            timeout = datetime.timedelta(seconds=2 * settings.boot_second)
+            if self._fleet_state.now() - migration.started_at > timeout:
+                logger.warning(f"Consolidation timed out. Type: {resource_type}")
+                del self.migrations[resource_type]
+            return None
+        del self.migrations[resource_type]
+
+        pods = snapshot.pods(resource_type)
+        to_delete = set(migration.to_delete)
+        cpu_overhead, ram_overhead = self._stats_service.get_overhead(resource_type)
+        need_cpu, need_ram = self._demand(resource_type, snapshot)
+        remaining = [pod for pod in pods if pod.id not in to_delete and not pod.failed]
+        if (
+            sum(pod.cpu - cpu_overhead for pod in remaining) < need_cpu
+            or sum(pod.ram - ram_overhead for pod in remaining) < need_ram
+        ):
+            logger.warning(
+                f"Consolidation kept old pods, capacity is below demand. "
+                f"Type: {resource_type}"
+            )
+            return None
+
+        report = await self._mutation_executor.execute(
+            [Mutation.delete(pod) for pod in pods if pod.id in to_delete], pods
+        )
+        self._fleet_state.record(report)
@@ -0,0 +1,115 @@
+import asyncio
+import collections
+import datetime
+import logging
+import os
+import typing as tp
+
+from src.services.stats import StatsService
+from src.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+SERIES = (
+    ("vm_cpu_load", 0, "green", "CPU"),
+    ("vm_ram_load", 0, "blue", "RAM"),
+    ("db_cpu_load", 1, "green", "CPU"),
+    ("db_ram_load", 1, "blue", "RAM"),
+    ("requests", 2, "red", "REQUESTS"),
+)
+TITLES = ("VM", "DB", "REQUESTS")
+
+
+class DashboardService:
+    _stats_service: StatsService
+
+    def __init__(
+        self, stats_service: StatsService, path: tp.Optional[str] = None
+    ) -> None:
+        self._stats_service: StatsService = stats_service
+        self.path: str = path or settings.plot_path
+
+        self._dates: tp.Deque[datetime.datetime] = collections.deque(
+            maxlen=settings.memory_size
+        )
+        self._values: tp.Dict[str, tp.Deque[float]] = {
+            name: collections.deque(maxlen=settings.memory_size)
+            for name, *_ in SERIES
+        }
+        self._last_timestamp: tp.Optional[datetime.datetime] = None
+
+        self._figure = None
+        self._axes = []
+        self._lines = {}
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.plot_second)
+            if not self.collect():
+                continue
+            try:
+                await asyncio.to_thread(self.render, *self._snapshot())
+            except Exception as exc:
+                logger.error(f"Failed render dashboard: {exc}")
+
+    def collect(self) -> bool:
+        updated = False
+        for timestamp, stat in list(self._stats_service.memory.items()):
+            if self._last_timestamp is not None and timestamp <= self._last_timestamp:
+                continue
+            self._dates.append(timestamp)
+            for name, *_ in SERIES:
+                self._values[name].append(getattr(stat, name))
+            self._last_timestamp = timestamp
+            updated = True
+        return updated
+
+    def _snapshot(self):
+        return list(self._dates), {name: list(v) for name, v in self._values.items()}
+
+    def render(
+        self, dates: tp.List[datetime.datetime], values: tp.Dict[str, tp.List[float]]
+    ) -> None:
+        if self._figure is None:
+            self._create_figure()
+
+        for name, *_ in SERIES:
+            self._lines[name].set_data(dates, values[name])
+        for ax in self._axes:
+            ax.relim()
+            ax.autoscale_view()
+
+        for fmt in settings.plot_formats:
+            path = f"{self.path}.{fmt}"
+            tmp_path = f"{path}.tmp"
+            self._figure.savefig(tmp_path, format=fmt)
+            os.replace(tmp_path, path)
+        logger.info(f"Dashboard saved. Points: {len(dates)}")
+
+    def _create_figure(self) -> None:
+        import matplotlib.dates as mdates
+
+        from matplotlib.figure import Figure
+
+        self._figure = Figure(figsize=(10, 9))
+        self._figure.suptitle("LOADS")
+        self._axes = self._figure.subplots(
+            3, gridspec_kw={"wspace": 0.5, "hspace": 0.5}
+        )
+
+        for ax, title in zip(self._axes, TITLES):
+            ax.title.set_text(title)
+            ax.xaxis_date()
+            ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M:%S"))
+        for ax in self._axes[:2]:
+            ax.axhline(y=settings.max_load, color="red", linestyle="--")
+            ax.axhline(y=settings.pod_load_max, color="orange", linestyle="--")
+
+        for name, index, color, label in SERIES:
+            (self._lines[name],) = self._axes[index].plot(
+                [], [], color=color, label=label, marker="o", markersize=3
+            )
+        for ax in self._axes:
+            ax.legend()
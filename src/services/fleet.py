@@ -0,0 +1,163 @@
+import asyncio
+import dataclasses
+import datetime
+import logging
+import typing as tp
+
+from src import models
+from src.services.mutation import Mutation, MutationKind, MutationReport
+from src.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Operation:
+    mutation: Mutation
+    issued_at: datetime.datetime
+    ready_at: datetime.datetime
+    pod_id: tp.Optional[int] = None
+
+    @property
+    def resource_type(self) -> models.ResourceType:
+        return self.mutation.resource_type
+
+
+class FleetState:
+    def __init__(
+        self, clock: tp.Callable[[], datetime.datetime] = datetime.datetime.now
+    ) -> None:
+        self.now: tp.Callable[[], datetime.datetime] = clock
+        self.pods: tp.Dict[int, models.GetResource] = {}
+        self.operations: tp.List[Operation] = []
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.version: int = 0
+
+    def record(self, report: MutationReport) -> None:
+        if report.succeeded:
+            self.version += 1
+        now = self.now()
+        for mutation in report.succeeded:
+            if mutation.kind == MutationKind.CREATE:
+                delay = settings.boot_second
+            elif mutation.kind == MutationKind.UPDATE:
+                delay = settings.resize_second
+            else:
+                delay = 0
+            self.operations.append(
+                Operation(
+                    mutation=mutation,
+                    issued_at=now,
+                    ready_at=now + datetime.timedelta(seconds=delay),
+                    pod_id=mutation.item_id,
+                )
+            )
+
+    def reconcile(self, resources: tp.List[models.GetResource]) -> None:
+        current = {pod.id: pod for pod in resources}
+        new_ids = [pod_id for pod_id in current if pod_id not in self.pods]
+        self.pods = current
+
+        for operation in self.operations:
+            if (
+                operation.mutation.kind != MutationKind.CREATE
+                or operation.pod_id is not None
+            ):
+                continue
+            for pod_id in new_ids:
+                pod = current[pod_id]
+                if (pod.type, pod.cpu, pod.ram) == operation.mutation.shape:
+                    operation.pod_id = pod_id
+                    new_ids.remove(pod_id)
+                    break
+
+        now = self.now()
+        timeout = datetime.timedelta(seconds=settings.boot_second)
+        pending = []
+        for operation in self.operations:
+            if self._is_done(operation, now):
+                continue
+            if now > operation.ready_at + timeout:
+                logger.warning(f"Operation timed out: {operation.mutation}")
+                continue
+            pending.append(operation)
+        self.operations = pending
+
+    def _is_done(self, operation: Operation, now: datetime.datetime) -> bool:
+        pod = self.pods.get(operation.pod_id)
+        if operation.mutation.kind == MutationKind.DELETE:
+            return pod is None
+        if operation.pod_id is None:
+            return False
+        if pod is None:
+            return True
+        return (
+            now >= operation.ready_at
+            and not pod.failed
+            and pod.cpu == operation.mutation.cpu
+            and pod.ram == operation.mutation.ram
+        )
+
+    def in_flight(self, resource_type: models.ResourceType) -> tp.List[Operation]:
+        return [item for item in self.operations if item.resource_type == resource_type]
+
+    def in_flight_ids(self, resource_type: models.ResourceType) -> tp.Set[int]:
+        return {
+            item.pod_id
+            for item in self.in_flight(resource_type)
+            if item.pod_id is not None
+        }
+
+    def genuine_failures(
+        self, resource_type: models.ResourceType
+    ) -> tp.List[models.GetResource]:
+        in_flight = self.in_flight_ids(resource_type)
+        return [
+            pod
+            for pod in self.pods.values()
+            if pod.type == resource_type and pod.failed and pod.id not in in_flight
+        ]
+
+    def effective_capacity(
+        self, resource_type: models.ResourceType, at: datetime.datetime
+    ) -> tp.Tuple[int, int, int]:
+        operations = {
+            item.pod_id: item
+            for item in self.in_flight(resource_type)
+            if item.pod_id is not None
+        }
+
+        cpu, ram, count = 0, 0, 0
+        for pod in self.pods.values():
+            if pod.type != resource_type:
+                continue
+            operation = operations.get(pod.id)
+            if operation is None:
+                if pod.failed:
+                    continue
+                cpu, ram, count = cpu + pod.cpu, ram + pod.ram, count + 1
+            elif operation.mutation.kind == MutationKind.DELETE:
+                continue
+            elif operation.ready_at <= at:
+                cpu += operation.mutation.cpu
+                ram += operation.mutation.ram
+                count += 1
+
+        for operation in self.in_flight(resource_type):
+            if (
+                operation.mutation.kind == MutationKind.CREATE
+                and operation.pod_id is None
+                and operation.ready_at <= at
+            ):
+                cpu += operation.mutation.cpu
+                ram += operation.mutation.ram
+                count += 1
+        return cpu, ram, count
+
+    def dump_state(self) -> tp.Dict[str, tp.Any]:
+        return {"pods": self.pods, "operations": self.operations}
+
+    def load_state(self, state: tp.Dict[str, tp.Any]) -> None:
+        self.pods = state["pods"]
+        self.operations = state["operations"]
@@ -0,0 +1,99 @@
+import math
+import typing as tp
+
+from src import models
+
+from src.estimator import RecursiveLeastSquares
+from src.services.stats import StatsService
+from src.settings import settings
+
+
+PRIOR = (100.0, 0.0, 0.0, 0.0, 0.0)
+
+
+class LatencyService:
+    _stats_service: StatsService
+
+    def __init__(self, stats_service: StatsService) -> None:
+        self._stats_service: StatsService = stats_service
+        self.estimator: RecursiveLeastSquares = RecursiveLeastSquares(
+            PRIOR, settings.estimator_forgetting, settings.estimator_huber
+        )
+        self._last_timestamp = None
+
+    @staticmethod
+    def features(vm_load: float, db_load: float) -> tp.List[float]:
+        vm_load, db_load = max(vm_load, 0.0), max(db_load, 0.0)
+        return [
+            1.0,
+            vm_load,
+            db_load,
+            1 / (1 - min(vm_load, 0.95)),
+            1 / (1 - min(db_load, 0.95)),
+        ]
+
+    def observe(self, stat: tp.Optional[models.Stat]) -> None:
+        if stat is None or stat.timestamp == self._last_timestamp:
+            return None
+        self._last_timestamp = stat.timestamp
+        if stat.response_time <= 0:
+            return None
+
+        self.estimator.update(
+            self.features(stat.vm_cpu_load / 100, stat.db_cpu_load / 100),
+            stat.response_time,
+        )
+
+    @property
+    def is_trained(self) -> bool:
+        return self.estimator.count >= settings.estimator_min_samples
+
+    def predict(self, vm_load: float, db_load: float) -> float:
+        return self.estimator.predict(self.features(vm_load, db_load))
+
+    def fleet_load(
+        self,
+        resource_type: models.ResourceType,
+        pods: tp.Sequence[tp.Union[models.Price, models.GetResource]],
+        requests: float,
+    ) -> float:
+        cpu = sum(pod.cpu for pod in pods)
+        if cpu <= 0:
+            return math.inf
+        cpu_overhead, _ = self._stats_service.get_overhead(resource_type)
+        cpu_request, _ = self._stats_service.get_request(resource_type)
+        return (requests * cpu_request + len(pods) * cpu_overhead) / cpu
+
+    def predict_fleet(
+        self,
+        resource_type: models.ResourceType,
+        pods: tp.Sequence[tp.Union[models.Price, models.GetResource]],
+        requests: float,
+    ) -> float:
+        load = self.fleet_load(resource_type, pods, requests)
+        stat = self._stats_service.get_last_stat()
+        if resource_type == models.ResourceType.VM:
+            other = stat.db_cpu_load / 100 if stat else 0.0
+            return self.predict(load, other)
+        other = stat.vm_cpu_load / 100 if stat else 0.0
+        return self.predict(other, load)
+
+    def is_safe(
+        self,
+        resource_type: models.ResourceType,
+        pods: tp.Sequence[tp.Union[models.Price, models.GetResource]],
+        requests: float,
+    ) -> bool:
+        if not self.is_trained:
+            return True
+        upper = self.predict_fleet(resource_type, pods, requests) + (
+            settings.latency_z * math.sqrt(self.estimator.residual_variance)
+        )
+        return upper < settings.response_time_limit
+
+    def dump_state(self) -> tp.Dict[str, tp.Any]:
+        return {"estimator": self.estimator, "last_timestamp": self._last_timestamp}
+
+    def load_state(self, state: tp.Dict[str, tp.Any]) -> None:
+        self.estimator = state["estimator"]
+        self._last_timestamp = state["last_timestamp"]
@@ -0,0 +1,95 @@
+import fcntl
+import importlib
+import logging
+import os
+import socket
+import typing as tp
+
+from src.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseBackend:
+    def acquire(self, key: str, holder: str) -> bool:
+        raise NotImplementedError
+
+    def release(self, key: str, holder: str) -> None:
+        raise NotImplementedError
+
+
+class FileLeaseBackend(LeaseBackend):
+    def __init__(self, directory: tp.Optional[str] = None) -> None:
+        self._directory: str = directory or settings.lease_dir
+        self._files: tp.Dict[str, tp.IO] = {}
+
+    def acquire(self, key: str, holder: str) -> bool:
+        if key in self._files:
+            return True
+
+        path = os.path.join(self._directory, f"leader-{key}.lock")
+        f = open(path, "a+")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+
+        f.seek(0)
+        f.truncate()
+        f.write(holder)
+        f.flush()
+        self._files[key] = f
+        return True
+
+    def release(self, key: str, holder: str) -> None:
+        f = self._files.pop(key, None)
+        if f is None:
+            return None
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        f.close()
+
+
+LEASE_BACKENDS: tp.Dict[str, tp.Type[LeaseBackend]] = {
+    "file": FileLeaseBackend,
+}
+
+
+def create_lease_backend(name: str) -> LeaseBackend:
+    if name in LEASE_BACKENDS:
+        return LEASE_BACKENDS[name]()
+
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class LeaderElection:
+    _backend: LeaseBackend
+
+    def __init__(
+        self, backend: LeaseBackend, key: str, holder: tp.Optional[str] = None
+    ) -> None:
+        self._backend: LeaseBackend = backend
+        self.key: str = key
+        self.holder: str = holder or f"{socket.gethostname()}:{os.getpid()}"
+        self.is_leader: bool = False
+
+    def refresh(self) -> bool:
+        try:
+            acquired = self._backend.acquire(self.key, self.holder)
+        except Exception as exc:
+            logger.error(f"Failed acquire lease. Key: {self.key}, error: {exc}")
+            acquired = False
+
+        if acquired and not self.is_leader:
+            logger.warning(f"Became leader. Key: {self.key}, holder: {self.holder}")
+        elif not acquired and self.is_leader:
+            logger.warning(f"Lost leadership. Key: {self.key}, holder: {self.holder}")
+
+        self.is_leader = acquired
+        return acquired
+
+    def release(self) -> None:
+        self._backend.release(self.key, self.holder)
+        self.is_leader = False
@@ -0,0 +1,242 @@
+import asyncio
+import collections
+import dataclasses
+import enum
+import logging
+import random
+import time
+import typing as tp
+
+from src import models
+from src.exceptions import TransientError
+from src.services.resource import ResourceService
+from src.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class MutationKind(enum.Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+@dataclasses.dataclass
+class Mutation:
+    kind: MutationKind
+    resource_type: models.ResourceType
+    cpu: int = 0
+    ram: int = 0
+    item_id: tp.Optional[int] = None
+    price: tp.Optional[models.Price] = None
+    current: tp.Optional[models.GetResource] = None
+
+    @classmethod
+    def create(cls, resource_type: models.ResourceType, price: models.Price):
+        return cls(
+            MutationKind.CREATE, resource_type, price.cpu, price.ram, price=price
+        )
+
+    @classmethod
+    def update(cls, pod: models.GetResource, body: models.PostResource):
+        return cls(
+            MutationKind.UPDATE, pod.type, body.cpu, body.ram, pod.id, current=pod
+        )
+
+    @classmethod
+    def delete(cls, pod: models.GetResource):
+        return cls(MutationKind.DELETE, pod.type, pod.cpu, pod.ram, pod.id, current=pod)
+
+    @property
+    def shape(self) -> tp.Tuple[models.ResourceType, int, int]:
+        return self.resource_type, self.cpu, self.ram
+
+    @property
+    def is_scale_up(self) -> bool:
+        if self.kind == MutationKind.CREATE:
+            return True
+        if self.kind == MutationKind.UPDATE:
+            return self.cpu >= self.current.cpu and self.ram >= self.current.ram
+        return False
+
+    def __str__(self) -> str:
+        return (
+            f"{self.kind.value} {self.resource_type.value} "
+            f"id={self.item_id} cpu={self.cpu} ram={self.ram}"
+        )
+
+
+@dataclasses.dataclass
+class MutationReport:
+    succeeded: tp.List[Mutation] = dataclasses.field(default_factory=list)
+    failed: tp.List[tp.Tuple[Mutation, str]] = dataclasses.field(default_factory=list)
+    skipped: tp.List[Mutation] = dataclasses.field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.skipped
+
+
+class CreateLedger:
+    def __init__(self) -> None:
+        self.created: tp.Counter = collections.Counter()
+        self.pending: tp.Counter = collections.Counter()
+        self.settled_at: tp.Dict[tp.Tuple[models.ResourceType, int, int], float] = {}
+        self._settled: asyncio.Condition = asyncio.Condition()
+
+    def issue(self, shape: tp.Tuple[models.ResourceType, int, int]) -> None:
+        self.pending[shape] += 1
+
+    async def resolve(
+        self, shape: tp.Tuple[models.ResourceType, int, int], applied: bool
+    ) -> None:
+        async with self._settled:
+            if applied:
+                self.created[shape] += 1
+            self.pending[shape] -= 1
+            self.settled_at[shape] = time.monotonic()
+            self._settled.notify_all()
+
+    async def wait(self, shape: tp.Tuple[models.ResourceType, int, int]) -> None:
+        async with self._settled:
+            await self._settled.wait_for(lambda: not self.pending[shape])
+
+
+class MutationExecutor:
+    dry_run: bool = False
+
+    _resource_service: ResourceService
+
+    def __init__(self, resource_service: ResourceService) -> None:
+        self._resource_service: ResourceService = resource_service
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(
+            settings.mutation_concurrency
+        )
+        self._reconcile_lock: asyncio.Lock = asyncio.Lock()
+        self._fresh: tp.List[models.GetResource] = []
+        self._fresh_at: float = 0
+
+    async def execute(
+        self,
+        mutations: tp.List[Mutation],
+        known_resources: tp.List[models.GetResource],
+    ) -> MutationReport:
+        report = MutationReport()
+        if not mutations:
+            return report
+
+        known_ids = {pod.id for pod in known_resources}
+        ledger = CreateLedger()
+
+        scale_ups = [item for item in mutations if item.is_scale_up]
+        scale_downs = [item for item in mutations if not item.is_scale_up]
+
+        await self._run_group(scale_ups, known_ids, ledger, report)
+        if report.failed:
+            report.skipped.extend(scale_downs)
+        else:
+            await self._run_group(scale_downs, known_ids, ledger, report)
+
+        logger.info(
+            f"Mutations: succeeded = [{len(report.succeeded)}], "
+            f"failed = [{len(report.failed)}], skipped = [{len(report.skipped)}]"
+        )
+        for mutation, error in report.failed:
+            logger.error(f"Failed mutation {mutation}: {error}")
+        return report
+
+    async def _run_group(self, mutations, known_ids, ledger, report) -> None:
+        results = await asyncio.gather(
+            *(self._run(item, known_ids, ledger) for item in mutations),
+            return_exceptions=True,
+        )
+        for mutation, result in zip(mutations, results):
+            if isinstance(result, BaseException):
+                report.failed.append((mutation, repr(result)))
+            else:
+                report.succeeded.append(mutation)
+
+    async def _run(
+        self, mutation: Mutation, known_ids: tp.Set[int], ledger: CreateLedger
+    ) -> None:
+        attempt = 0
+        while True:
+            failed_at = time.monotonic()
+            try:
+                async with self._semaphore:
+                    await self._send(mutation, ledger)
+            except TransientError:
+                attempt += 1
+                if attempt > settings.mutation_retries:
+                    raise
+                await asyncio.sleep(
+                    random.uniform(0, settings.mutation_backoff_second * 2 ** attempt)
+                )
+                if await self._is_applied(mutation, known_ids, ledger, failed_at):
+                    logger.warning(f"Mutation applied despite error: {mutation}")
+                    return None
+                continue
+            return None
+
+    async def _send(self, mutation: Mutation, ledger: CreateLedger) -> None:
+        if mutation.kind != MutationKind.CREATE:
+            return await self._apply(mutation)
+
+        ledger.issue(mutation.shape)
+        applied = False
+        try:
+            await self._apply(mutation)
+            applied = True
+        finally:
+            await ledger.resolve(mutation.shape, applied)
+
+    async def _apply(self, mutation: Mutation) -> None:
+        if mutation.kind == MutationKind.CREATE:
+            await self._resource_service.add(mutation.resource_type, mutation.price)
+        elif mutation.kind == MutationKind.UPDATE:
+            await self._resource_service.put(
+                mutation.item_id,
+                models.PostResource(
+                    cpu=mutation.cpu, ram=mutation.ram, type=mutation.resource_type,
+                ),
+            )
+        else:
+            await self._resource_service.delete_by_id(mutation.item_id)
+
+    async def _is_applied(
+        self,
+        mutation: Mutation,
+        known_ids: tp.Set[int],
+        ledger: CreateLedger,
+        failed_at: float,
+    ) -> bool:
+        if mutation.kind == MutationKind.CREATE:
+            # A same-shape sibling may be applied on the server but not yet
+            # acknowledged; wait for it so its pod is not claimed here.
+            await ledger.wait(mutation.shape)
+            failed_at = max(failed_at, ledger.settled_at.get(mutation.shape, 0))
+
+        async with self._reconcile_lock:
+            if self._fresh_at < failed_at:
+                self._fresh = await self._resource_service.get()
+                self._fresh_at = time.monotonic()
+
+            if mutation.kind == MutationKind.CREATE:
+                new_count = sum(
+                    1
+                    for pod in self._fresh
+                    if pod.id not in known_ids
+                    and (pod.type, pod.cpu, pod.ram) == mutation.shape
+                )
+                if new_count > ledger.created[mutation.shape]:
+                    ledger.created[mutation.shape] += 1
+                    return True
+                return False
+
+            pod = next((pod for pod in self._fresh if pod.id == mutation.item_id), None)
+            if mutation.kind == MutationKind.DELETE:
+                return pod is None
+            if pod is None:
+                raise RuntimeError(f"Resource {mutation.item_id} disappeared")
+            return pod.cpu == mutation.cpu and pod.ram == mutation.ram
@@ -1,10 +1,11 @@
+import collections
 import logging
 import math
-import pandas as pd
 import typing as tp
+from statistics import NormalDist
 
-from pmdarima import auto_arima
-
+from src.forecast import FORECASTERS, Forecast, Forecaster
+from src.rolling import RollingStats
 from src.services.stats import StatsService
 from src.settings import settings
 
@@ -15,49 +16,207 @@ logger = logging.getLogger(__name__)
 class PredictService:
     _stats_service: StatsService
 
-    requests: tp.List[int] = []
+    requests: tp.List[int]
+    std: tp.List[float]
+    selected: tp.Optional[str]
 
     def __init__(self, stats_service: StatsService) -> None:
         self._stats_service: StatsService = stats_service
+        self.requests = []
+        self.std = []
+        self.selected = None
+
+        self.forecasters: tp.List[Forecaster] = [
+            FORECASTERS[name]() for name in settings.forecast_models
+        ]
+        self.mae: tp.Dict[str, tp.List[RollingStats]] = {}
+        self.mape: tp.Dict[str, tp.List[RollingStats]] = {}
+        for forecaster in self.forecasters:
+            self.mae[forecaster.name] = self._create_scores()
+            self.mape[forecaster.name] = self._create_scores()
+
+        self._pending: tp.Deque[tp.Tuple[int, tp.Dict[str, tp.List[float]]]] = (
+            collections.deque()
+        )
+        self._tick: int = 0
+        self._last_timestamp = None
 
     def predict(self):
+        self._score()
         self._predict_request()
 
+    def _score(self) -> None:
+        stat = self._stats_service.get_last_stat()
+        if stat is None or stat.timestamp == self._last_timestamp:
+            return None
+        self._last_timestamp = stat.timestamp
+        self._tick += 1
+
+        pending = collections.deque()
+        for tick, forecasts in self._pending:
+            step = self._tick - tick - 1
+            for name, means in forecasts.items():
+                if name not in self.mae:
+                    continue
+                error = abs(stat.requests - means[step])
+                self.mae[name][step].push(error)
+                self.mape[name][step].push(error / max(stat.requests, 1))
+            if step + 1 < settings.forecast_horizon:
+                pending.append((tick, forecasts))
+        self._pending = pending
+
     def _predict_request(self) -> None:
         if len(self._stats_service.memory) < settings.min_memory_size:
             return None
 
-        try:
-            dates = [
-                item.timestamp
-                for item in list(self._stats_service.memory.values())[
-                    -settings.train_size:
-                ]
-            ]
-            requests = [
-                item.requests
-                for item in list(self._stats_service.memory.values())[
-                    -settings.train_size:
-                ]
+        requests = [
+            item.requests
+            for item in list(self._stats_service.memory.values())[
+                -settings.train_size:
             ]
+        ]
+
+        forecasts: tp.Dict[str, Forecast] = {}
+        for forecaster in self.forecasters:
+            try:
+                forecasts[forecaster.name] = forecaster.forecast(
+                    requests, settings.forecast_horizon
+                )
+            except Exception as e:
+                logger.error(f"Failed predict: model = {forecaster.name}, error = {e}")
+
+        if not forecasts:
+            self.selected = None
+            self.requests = []
+            self.std = []
+            return None
 
-            df = pd.DataFrame(list(zip(dates, requests)), columns=["date", "requests"])
-            df.set_index("date", inplace=True)
-
-            train = df["requests"]
-
-            model = auto_arima(
-                train, trace=False, error_action="ignore", suppress_warnings=True
+        if not self._pending or self._pending[-1][0] != self._tick:
+            self._pending.append(
+                (self._tick, {name: means for name, (means, _) in forecasts.items()})
             )
-            model.fit(train)
-
-            result = model.predict(n_periods=6)
-
-            self.requests = [math.ceil(i) for i in list(result)]
-        except Exception as e:
-            logger.error(f"Failed predict: {e}")
-            self.requests = []
+        if settings.forecast_mode == "ensemble":
+            means, std = self._ensemble(forecasts)
+        else:
+            means, std = self._best(forecasts)
+
+        self.requests = [max(math.ceil(value), 0) for value in means]
+        self.std = std
+
+        scores = {name: round(self.score(name), 2) for name in forecasts}
+        metrics = self.metrics()
+        errors = {
+            name: [
+                None if value is None else round(value, 3)
+                for value in metrics[name]["mape"]
+            ]
+            for name in forecasts
+        }
+        logger.info(
+            f"#forecast: selected = [{self.selected}], mae = [{scores}], "
+            f"mape = [{errors}]"
+        )
+
+    def _best(self, forecasts: tp.Dict[str, Forecast]) -> Forecast:
+        self.selected = min(forecasts, key=self.score)
+        return forecasts[self.selected]
+
+    def _ensemble(self, forecasts: tp.Dict[str, Forecast]) -> Forecast:
+        self.selected = "ensemble"
+        means, std = [], []
+        for step in range(settings.forecast_horizon):
+            scores = [self.mae[name][step] for name in forecasts]
+            if all(score.count for score in scores):
+                weights = [1 / max(score.mean, 1e-6) for score in scores]
+            else:
+                weights = [1.0] * len(scores)
+            total = sum(weights)
+
+            mean = sum(
+                weight * forecast[0][step]
+                for weight, forecast in zip(weights, forecasts.values())
+            ) / total
+            variance = sum(
+                weight * (forecast[1][step] ** 2 + (forecast[0][step] - mean) ** 2)
+                for weight, forecast in zip(weights, forecasts.values())
+            ) / total
+            means.append(mean)
+            std.append(math.sqrt(variance))
+        return means, std
+
+    def score(self, name: str) -> float:
+        scores = [item.mean for item in self.mae[name] if item.count]
+        if not scores:
+            return math.inf
+        return sum(scores) / len(scores)
+
+    def metrics(self) -> tp.Dict[str, tp.Dict[str, tp.List[tp.Optional[float]]]]:
+        return {
+            name: {
+                "mae": [item.mean if item.count else None for item in self.mae[name]],
+                "mape": [
+                    item.mean if item.count else None for item in self.mape[name]
+                ],
+            }
+            for name in self.mae
+        }
+
+    def distribution(self, step: int) -> NormalDist:
+        return NormalDist(self.requests[step], max(self.std[step], 1e-6))
+
+    def quantile(self, step: int, q: float) -> int:
+        return max(math.ceil(self.distribution(step).inv_cdf(q)), 0)
+
+    def exceed_probability(self, step: int, requests: float) -> float:
+        return 1 - self.distribution(step).cdf(requests)
+
+    def dump_state(self) -> tp.Dict[str, tp.Any]:
+        return {
+            "requests": self.requests,
+            "std": self.std,
+            "selected": self.selected,
+            "mae": self.mae,
+            "mape": self.mape,
+            "pending": self._pending,
+            "tick": self._tick,
+            "last_timestamp": self._last_timestamp,
+        }
+
+    def load_state(self, state: tp.Dict[str, tp.Any]) -> None:
+        self.requests = state["requests"]
+        self.std = state["std"]
+        self.selected = state["selected"]
+        horizon = settings.forecast_horizon
+        for name in self.mae:
+            if name in state["mae"] and len(state["mae"][name]) == horizon:
+                self.mae[name] = state["mae"][name]
+                self.mape[name] = state["mape"][name]
+        self._pending = collections.deque(
+            (
+                tick,
+                {
+                    name: means
+                    for name, means in forecasts.items()
+                    if name in self.mae
+                },
+            )
+            for tick, forecasts in state["pending"]
+            if all(len(means) == horizon for means in forecasts.values())
+        )
+        self._tick = state["tick"]
+        self._last_timestamp = state["last_timestamp"]
 
     @property
     def is_request_predicted(self):
         return len(self.requests) > 0
+
+    @property
+    def has_intervals(self) -> bool:
+        return self.is_request_predicted and len(self.std) == len(self.requests)
+
+    @staticmethod
+    def _create_scores() -> tp.List[RollingStats]:
+        return [
+            RollingStats(settings.forecast_window, settings.ewma_alpha)
+            for _ in range(settings.forecast_horizon)
+        ]
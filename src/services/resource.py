@@ -5,6 +5,7 @@ from src import models
 
 from src.clients.price import PriceClient
 from src.clients.resource import ResourceClient
+from src.services.leader import LeaderElection
 from src.settings import settings
 
 
@@ -13,27 +14,38 @@ class ResourceService:
     _resource_client: ResourceClient
 
     def __init__(
-        self, price_client: PriceClient, resource_client: ResourceClient
+        self,
+        price_client: PriceClient,
+        resource_client: ResourceClient,
+        leader: tp.Optional[LeaderElection] = None,
     ) -> None:
         self._price_client: PriceClient = price_client
         self._resource_client: ResourceClient = resource_client
+        self._leader: tp.Optional[LeaderElection] = leader
 
-    async def init(self, prices) -> None:
-        tasks = []
+    @property
+    def is_active(self) -> bool:
+        return settings.prod and (self._leader is None or self._leader.is_leader)
+
+    @staticmethod
+    def initial_resources(
+        prices,
+    ) -> tp.List[tp.Tuple[models.ResourceType, models.Price]]:
+        result = []
 
         min_vm = min(prices[models.ResourceType.VM], key=lambda x: x.cost)
         max_vm = max(prices[models.ResourceType.VM], key=lambda x: x.cost)
         cnt = round(max_vm.cost / min_vm.cost) - 1
         for _ in range(max(1, cnt)):
-            tasks.append(self.add(models.ResourceType.VM, min_vm))
+            result.append((models.ResourceType.VM, min_vm))
 
         min_db = min(prices[models.ResourceType.DB], key=lambda x: x.cost)
         max_db = max(prices[models.ResourceType.DB], key=lambda x: x.cost)
         cnt = round(max_db.cost / min_db.cost) - 1
         for _ in range(max(1, cnt)):
-            tasks.append(self.add(models.ResourceType.DB, min_db))
+            result.append((models.ResourceType.DB, min_db))
 
-        await asyncio.gather(*(tasks if settings.prod else []))
+        return result
 
     async def get(self) -> tp.List[models.GetResource]:
         return await self._resource_client.get()
@@ -55,4 +67,4 @@ class ResourceService:
         resources = await self._resource_client.get()
 
         tasks = [self._resource_client.delete(resource.id) for resource in resources]
-        await asyncio.gather(*(tasks if settings.prod else []))
+        await asyncio.gather(*(tasks if self.is_active else []))
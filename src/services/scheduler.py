@@ -1,28 +1,54 @@
-import asyncio
+import collections
+import dataclasses
 import datetime
 import logging
+import math
 import typing as tp
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+
+import numpy as np
 
 from src import models
 from src import utils
 
+from src.capacity import CapacitySimulator
 from src.clients.price import PriceClient
+from src.services.fleet import FleetState
+from src.services.latency import LatencyService
+from src.services.mutation import Mutation, MutationExecutor, MutationKind
 from src.services.resource import ResourceService
 from src.services.stats import StatsService
 from src.services.predict import PredictService
+from src.rolling import RollingStats
 from src.settings import settings
+from src.snapshot import FleetSnapshot
+from src.workers import WorkerPool
 
 logger = logging.getLogger(__name__)
 
+HISTORIES = ("vm_cpu_load", "vm_ram_load", "db_cpu_load", "db_ram_load")
+
+
+@dataclasses.dataclass
+class Plan:
+    to_create: tp.List[models.Price]
+    to_update: tp.List[tp.Tuple[int, models.PostResource]]
+    to_delete: tp.List[int]
+    need_cpu: float
+    need_ram: float
+
+
+@dataclasses.dataclass
+class TickInputs:
+    prices: tp.Dict[models.ResourceType, tp.List[models.Price]]
+    resources: tp.List[models.GetResource]
+
 
 class SchedulerService:
-    dates = []
-    vm_cpu_load = []
-    vm_ram_load = []
-    db_cpu_load = []
-    db_ram_load = []
+    dates: tp.Deque[datetime.datetime]
+    vm_cpu_load: RollingStats
+    vm_ram_load: RollingStats
+    db_cpu_load: RollingStats
+    db_ram_load: RollingStats
 
     def __init__(
         self,
@@ -30,92 +56,260 @@ class SchedulerService:
         resource_service: ResourceService,
         stat_service: StatsService,
         predict_service: PredictService,
+        mutation_executor: MutationExecutor,
+        fleet_state: FleetState,
+        latency_service: LatencyService,
+        workers: WorkerPool,
+        name: str = "live",
     ):
         self._price_client: PriceClient = price_client
         self._resource_service: ResourceService = resource_service
         self._stat_service: StatsService = stat_service
         self._predict_service: PredictService = predict_service
-
-    async def task(self):
+        self._mutation_executor: MutationExecutor = mutation_executor
+        self._fleet_state: FleetState = fleet_state
+        self._latency_service: LatencyService = latency_service
+        self._workers: WorkerPool = workers
+        self.name: str = name
+
+        self.dates = collections.deque(maxlen=settings.max_data_size)
+        for name in HISTORIES:
+            setattr(self, name, RollingStats(settings.gap, settings.ewma_alpha))
+
+    async def task(self) -> TickInputs:
+        inputs = await self.collect()
+        await self.decide(inputs)
+        return inputs
+
+    async def collect(self) -> TickInputs:
         logger.info("#task: start")
-        await self.calculate()
-
-    async def calculate(self):
         prices = await self._price_client.get_grouped_prices()
 
-        await self._stat_service.update_stats(prices)
-        self._predict_service.predict()
-
         current_resources = await self._resource_service.get()
-        if not current_resources:
-            await self._resource_service.init(prices)
+        self._fleet_state.reconcile(current_resources)
+
+        await self._stat_service.update_stats(current_resources)
+        self._latency_service.observe(self._stat_service.get_last_stat())
+        await self._workers.run(self._predict_service.predict)
+        return TickInputs(prices, current_resources)
+
+    async def decide(self, inputs: TickInputs) -> None:
+        if not inputs.resources:
+            await self.init(inputs.prices)
         else:
-            await self.update(current_resources, prices)
+            await self.update(inputs.resources, inputs.prices)
 
-        self._clear_data()
-        self._plot()
+    async def init(self, prices) -> None:
+        mutations = [
+            Mutation.create(resource_type, price)
+            for resource_type, price in self._resource_service.initial_resources(prices)
+        ]
+        async with self._fleet_state.lock:
+            await self._apply(mutations, [])
 
     async def update(self, current_resources, prices):
-        resources = {}
-        for resource in current_resources:
-            resources.setdefault(resource.type, []).append(resource)
+        snapshot = FleetSnapshot(current_resources)
 
         self.dates.append(datetime.datetime.now())
         await self.update_by_type(
-            models.ResourceType.VM, resources, prices,
+            models.ResourceType.VM, snapshot, prices,
         )
         await self.update_by_type(
-            models.ResourceType.DB, resources, prices,
+            models.ResourceType.DB, snapshot, prices,
         )
 
     async def update_by_type(
         self,
         resource_type: models.ResourceType,
-        resources: tp.Dict[models.ResourceType, tp.List[models.GetResource]],
+        snapshot: FleetSnapshot,
         all_prices: tp.Dict[models.ResourceType, tp.List[models.Price]],
     ):
-        pods = resources.get(resource_type, [])
+        pods = snapshot.pods(resource_type)
         prices = all_prices[resource_type]
-        active_pods = list(pod for pod in pods if not pod.failed)
 
-        pod_count = len(pods)
-        active_pod_count = len(active_pods)
+        pod_count = snapshot.count(resource_type)
+        active_pod_count = snapshot.active_count(resource_type)
         not_active_pods_count = pod_count - active_pod_count
 
-        cpu_load, ram_load = self._get_load(active_pods)
-        cpu = sum(pod.cpu for pod in active_pods)
-        ram = sum(pod.ram for pod in active_pods)
-        is_app_offline = self._is_offline(active_pods)
+        cpu_load, ram_load = snapshot.load(resource_type)
+        is_app_offline = snapshot.is_offline(resource_type)
 
         cpu_overhead, ram_overhead = self._stat_service.get_overhead(resource_type)
-        abs_cpu_load, abs_ram_load = self._get_abs_load(
-            active_pods, cpu, ram, cpu_overhead, ram_overhead
+        abs_cpu_load, abs_ram_load = snapshot.abs_load(
+            resource_type, cpu_overhead, ram_overhead
         )
 
-        if resource_type == resource_type.VM:
-            self.vm_cpu_load.append(abs_cpu_load)
-            self.vm_ram_load.append(abs_ram_load)
-        elif resource_type == resource_type.DB:
-            self.db_cpu_load.append(abs_cpu_load)
-            self.db_ram_load.append(abs_ram_load)
+        cpu_diff, ram_diff = self.relative_average_diff(
+            resource_type, abs_cpu_load, abs_ram_load
+        )
+        cpu_history, ram_history = self._histories(resource_type)
+        cpu_history.push(abs_cpu_load)
+        ram_history.push(abs_ram_load)
 
         logger.info(
             "#updateByType: type = [%s], pod count = [%s], active pod count = [%s], "
-            "not active pod count = [%s], cpu load = [%s], ram load = [%s]",
+            "not active pod count = [%s], in flight = [%s], failed = [%s], "
+            "cpu load = [%s], ram load = [%s], volatility = [%.3f]",
             resource_type,
             pod_count,
             active_pod_count,
             not_active_pods_count,
+            len(self._fleet_state.in_flight(resource_type)),
+            len(self._fleet_state.genuine_failures(resource_type)),
             cpu_load,
             ram_load,
+            self.volatility(resource_type),
         )
 
-        cpu_diff, ram_diff = self.relative_average_diff(
-            resource_type, abs_cpu_load, abs_ram_load
-        )
         if ram_diff >= settings.delta or cpu_diff >= settings.delta:
             return None
 
+        plan = await self._workers.run(
+            self._plan_changes,
+            resource_type,
+            pods,
+            prices,
+            abs_cpu_load,
+            abs_ram_load,
+            cpu_overhead,
+            ram_overhead,
+            is_app_offline,
+        )
+        if plan is None:
+            return None
+        async with self._fleet_state.lock:
+            current = {
+                pod.id: (pod.cpu, pod.ram)
+                for pod in self._fleet_state.pods.values()
+                if pod.type == resource_type
+            }
+            if current != {pod.id: (pod.cpu, pod.ram) for pod in pods}:
+                logger.info("#skipStale: type = [%s]", resource_type)
+                return None
+
+            plan = self._skip_in_flight(
+                resource_type, plan, cpu_overhead, ram_overhead
+            )
+
+            pods_by_id = {pod.id: pod for pod in pods}
+            mutations = [
+                Mutation.create(resource_type, price) for price in plan.to_create
+            ]
+            mutations.extend(
+                Mutation.update(pods_by_id[item_id], resource)
+                for item_id, resource in plan.to_update
+            )
+            mutations.extend(
+                Mutation.delete(pods_by_id[item_id]) for item_id in plan.to_delete
+            )
+
+            self._log_decision(resource_type, snapshot, prices, mutations)
+            await self._apply(mutations, pods)
+
+    async def _apply(
+        self, mutations: tp.List[Mutation], pods: tp.List[models.GetResource]
+    ) -> None:
+        if self._mutation_executor.dry_run:
+            await self._mutation_executor.execute(mutations, pods)
+        elif self._resource_service.is_active:
+            report = await self._mutation_executor.execute(mutations, pods)
+            self._fleet_state.record(report)
+
+    def _log_decision(
+        self,
+        resource_type: models.ResourceType,
+        snapshot: FleetSnapshot,
+        prices: tp.List[models.Price],
+        mutations: tp.List[Mutation],
+    ) -> None:
+        costs = {(price.cpu, price.ram): price.cost for price in prices}
+        cost = snapshot.cost_total(resource_type)
+        cpu, ram = snapshot.total_capacity(resource_type)
+        counts = collections.Counter(mutation.kind for mutation in mutations)
+        for mutation in mutations:
+            if mutation.kind == MutationKind.CREATE:
+                cost += mutation.price.cost
+                cpu, ram = cpu + mutation.cpu, ram + mutation.ram
+            elif mutation.kind == MutationKind.UPDATE:
+                cost += costs.get((mutation.cpu, mutation.ram), 0) - mutation.current.cost
+                cpu += mutation.cpu - mutation.current.cpu
+                ram += mutation.ram - mutation.current.ram
+            else:
+                cost -= mutation.current.cost
+                cpu, ram = cpu - mutation.cpu, ram - mutation.ram
+
+        used_cpu, used_ram = snapshot.abs_load(resource_type, 0, 0)
+        load = max(
+            used_cpu / cpu * 100 if cpu > 0 else math.inf,
+            used_ram / ram * 100 if ram > 0 else math.inf,
+        )
+        logger.info(
+            "#decision: policy = [%s], type = [%s], create = [%s], update = [%s], "
+            "delete = [%s], projected cost = [%s], projected headroom = [%.1f]",
+            self.name,
+            resource_type,
+            counts[MutationKind.CREATE],
+            counts[MutationKind.UPDATE],
+            counts[MutationKind.DELETE],
+            cost,
+            settings.max_load - load,
+        )
+
+    def _skip_in_flight(
+        self,
+        resource_type: models.ResourceType,
+        plan: Plan,
+        cpu_overhead: float,
+        ram_overhead: float,
+    ) -> Plan:
+        if not self._fleet_state.in_flight(resource_type):
+            return plan
+
+        locked = self._fleet_state.in_flight_ids(resource_type)
+        to_update = [item for item in plan.to_update if item[0] not in locked]
+        to_delete = [item_id for item_id in plan.to_delete if item_id not in locked]
+
+        to_create = plan.to_create
+        cpu, ram, count = self._fleet_state.effective_capacity(
+            resource_type,
+            self._fleet_state.now() + datetime.timedelta(seconds=settings.boot_second),
+        )
+        for item_id in to_delete:
+            pod = self._fleet_state.pods.get(item_id)
+            if pod is not None and not pod.failed:
+                cpu, ram, count = cpu - pod.cpu, ram - pod.ram, count - 1
+        for item_id, resource in to_update:
+            pod = self._fleet_state.pods.get(item_id)
+            if pod is not None and not pod.failed:
+                cpu += min(resource.cpu, pod.cpu) - pod.cpu
+                ram += min(resource.ram, pod.ram) - pod.ram
+        if (
+            cpu - count * cpu_overhead >= plan.need_cpu
+            and ram - count * ram_overhead >= plan.need_ram
+        ):
+            to_create = []
+
+        skipped = (
+            len(plan.to_create) + len(plan.to_update) + len(plan.to_delete)
+            - len(to_create) - len(to_update) - len(to_delete)
+        )
+        if skipped:
+            logger.info(
+                "#skipInFlight: type = [%s], skipped = [%s]", resource_type, skipped
+            )
+        return Plan(to_create, to_update, to_delete, plan.need_cpu, plan.need_ram)
+
+    def _plan_changes(
+        self,
+        resource_type: models.ResourceType,
+        pods: tp.List[models.GetResource],
+        prices: tp.List[models.Price],
+        abs_cpu_load: float,
+        abs_ram_load: float,
+        cpu_overhead: float,
+        ram_overhead: float,
+        is_app_offline: bool,
+    ) -> tp.Optional[Plan]:
         predicted = False
         need_pods = []
         p_need_cpu, p_need_ram = 0, 0
@@ -124,9 +318,10 @@ class SchedulerService:
             and self._predict_service.is_request_predicted
         ):
             predicted = True
-            for request_cnt in self._predict_service.requests:
-                p_need_pods = self._stat_service.get_need_resource(
-                    prices, resource_type, request_cnt,
+            risk = None
+            for step in range(len(self._predict_service.requests)):
+                p_need_pods, p_risk = self._size_for_step(
+                    resource_type, prices, step, cpu_overhead, ram_overhead
                 )
 
                 pred_need_cpu = sum(pod.cpu for pod in p_need_pods)
@@ -145,6 +340,15 @@ class SchedulerService:
                 p_need_cpu = p_abs_cpu
                 p_need_ram = p_abs_ram
                 need_pods = p_need_pods
+                risk = p_risk
+
+            if risk is not None:
+                logger.info(
+                    "#riskSizing: type = [%s], pods = [%s], offline probability = [%.4f]",
+                    resource_type,
+                    len(need_pods),
+                    risk,
+                )
 
         if not predicted and len(self._stat_service.memory) >= settings.min_memory_size:
             return None
@@ -159,6 +363,9 @@ class SchedulerService:
 
         if not need_pods:
             return None
+        need_pods, need_cpu = self._bump_for_latency(
+            resource_type, prices, need_pods, need_cpu, cpu_overhead, ram_overhead
+        )
 
         pods = sorted(pods, key=lambda x: (x.cpu, x.ram), reverse=True)
         need_pods = sorted(need_pods, key=lambda x: (x.cpu, x.ram), reverse=True)
@@ -171,56 +378,122 @@ class SchedulerService:
             to_create, to_update, to_delete = self._calculate_vm_changes(
                 pods, need_pods, need_cpu, need_ram, cpu_overhead, ram_overhead,
             )
+        return Plan(to_create, to_update, to_delete, need_cpu, need_ram)
 
-        tasks = []
-        for resource in to_create:
-            tasks.append(self._resource_service.add(resource_type, resource))
-        for item_id, resource in to_update:
-            tasks.append(self._resource_service.put(item_id, resource))
-        for item_id in to_delete:
-            tasks.append(self._resource_service.delete_by_id(item_id))
-
-        await asyncio.gather(*(tasks if settings.prod else []))
+    def _bump_for_latency(
+        self,
+        resource_type: models.ResourceType,
+        prices: tp.List[models.Price],
+        need_pods: tp.List[models.Price],
+        need_cpu: float,
+        cpu_overhead: float,
+        ram_overhead: float,
+    ) -> tp.Tuple[tp.List[models.Price], float]:
+        stat = self._stat_service.get_last_stat()
+        requests = max(
+            self._predict_service.requests, default=stat.requests if stat else 0
+        )
 
-    def relative_average_diff(
-        self, resource_type: models.ResourceType, cpu_value, ram_value
-    ):
-        if resource_type == models.ResourceType.VM:
-            return self._vm_relative_average_diff(cpu_value, ram_value)
-        return self._db_relative_average_diff(cpu_value, ram_value)
+        for _ in range(settings.latency_bumps):
+            if self._latency_service.is_safe(resource_type, need_pods, requests):
+                return need_pods, need_cpu
+            need_cpu = max(
+                need_cpu,
+                sum(pod.cpu - cpu_overhead for pod in need_pods) * settings.latency_bump,
+            )
+            need_ram = sum(pod.ram - ram_overhead for pod in need_pods)
+            logger.info(
+                "#latencyBump: type = [%s], predicted = [%.0f], need cpu = [%.2f]",
+                resource_type,
+                self._latency_service.predict_fleet(resource_type, need_pods, requests),
+                need_cpu,
+            )
+            need_pods = utils.choose_resource(
+                prices, need_cpu, need_ram, cpu_overhead, ram_overhead
+            )
 
-    def _vm_relative_average_diff(self, cpu_value, ram_value):
-        if len(self.vm_ram_load) < 4 and len(self.vm_cpu_load) < 4:
-            return 5, 5
+        if not self._latency_service.is_safe(resource_type, need_pods, requests):
+            logger.warning(
+                "#latencyBump: type = [%s], plan still near the response time limit",
+                resource_type,
+            )
+        return need_pods, need_cpu
 
-        avg_ram = max(
-            sum(self.vm_ram_load[-(settings.gap + 1) : -1]) / settings.gap, 0.1
-        )
-        avg_cpu = max(
-            sum(self.vm_cpu_load[-(settings.gap + 1) : -1]) / settings.gap, 0.1
-        )
+    def _size_for_step(
+        self,
+        resource_type: models.ResourceType,
+        prices: tp.List[models.Price],
+        step: int,
+        cpu_overhead: float,
+        ram_overhead: float,
+    ) -> tp.Tuple[tp.List[models.Price], tp.Optional[float]]:
+        cpu_request, ram_request = self._stat_service.get_request(resource_type)
+        if (
+            not self._predict_service.has_intervals
+            or cpu_request <= 0
+            or ram_request <= 0
+        ):
+            return (
+                self._stat_service.get_need_resource(
+                    prices, resource_type, self._predict_service.requests[step],
+                ),
+                None,
+            )
 
-        return (
-            abs((avg_cpu - cpu_value) / avg_cpu),
-            abs((avg_ram - ram_value) / avg_ram),
+        load_cap = settings.max_load / 100
+        levels = {settings.offline_probability}
+        levels.update(
+            level for level in settings.risk_levels
+            if level <= settings.offline_probability
         )
 
-    def _db_relative_average_diff(self, cpu_value, ram_value):
-        if len(self.db_ram_load) < 4 and len(self.db_cpu_load) < 4:
-            return 5, 5
+        sized = {}
+        for level in sorted(levels, reverse=True):
+            requests = self._predict_service.quantile(step, 1 - level)
+            if requests not in sized:
+                sized[requests] = self._stat_service.get_need_resource(
+                    prices, resource_type, requests, load_cap
+                )
+        candidates = [need_pods for need_pods in sized.values() if need_pods]
+        if not candidates:
+            return [], None
 
-        avg_ram = max(
-            sum(self.db_ram_load[-(settings.gap + 1) : -1]) / settings.gap, 0.1
+        simulator = CapacitySimulator(
+            prices, cpu_request, ram_request, cpu_overhead, ram_overhead
         )
-        avg_cpu = max(
-            sum(self.db_cpu_load[-(settings.gap + 1) : -1]) / settings.gap, 0.1
+        counts = simulator.counts(candidates)
+        risks = [
+            self._predict_service.exceed_probability(step, float(served))
+            for served in simulator.served(counts, load_cap)
+        ]
+        costs = simulator.evaluate(counts, 0).cost + (
+            np.array(risks) * settings.offline_minute_cost
         )
+        best = int(np.argmin(costs))
+        return candidates[best], risks[best]
 
+    def relative_average_diff(
+        self, resource_type: models.ResourceType, cpu_value, ram_value
+    ):
+        cpu_history, ram_history = self._histories(resource_type)
+        if not cpu_history.is_full or not ram_history.is_full:
+            return 5, 5
         return (
-            abs((avg_cpu - cpu_value) / avg_cpu),
-            abs((avg_ram - ram_value) / avg_ram),
+            cpu_history.relative_diff(cpu_value),
+            ram_history.relative_diff(ram_value),
         )
 
+    def volatility(self, resource_type: models.ResourceType) -> float:
+        cpu_history, ram_history = self._histories(resource_type)
+        return max(cpu_history.volatility(), ram_history.volatility())
+
+    def _histories(
+        self, resource_type: models.ResourceType
+    ) -> tp.Tuple[RollingStats, RollingStats]:
+        if resource_type == models.ResourceType.VM:
+            return self.vm_cpu_load, self.vm_ram_load
+        return self.db_cpu_load, self.db_ram_load
+
     @staticmethod
     def _calculate_vm_changes_offline(
         pods: tp.List[models.GetResource], need_pods: tp.List[models.Price],
@@ -310,86 +583,10 @@ class SchedulerService:
         to_delete = [pod.id for pod in pods]
         return to_create, to_update, to_delete
 
-    def _is_offline(self, pods: tp.List[models.GetResource]):
-        cpu_load, ram_load = self._get_load(pods)
-        if cpu_load >= settings.max_load or ram_load >= settings.max_load:
-            return True
-        return False
-
-    @staticmethod
-    def _get_load(pods: tp.List[models.GetResource]):
-        cpu_load = sum(pod.cpu_load * pod.cpu for pod in pods)
-        ram_load = sum(pod.ram_load * pod.ram for pod in pods)
-        return cpu_load, ram_load
-
-    def _get_abs_load(
-        self, pods: tp.List[models.GetResource], cpu, ram, cpu_overhead, ram_overhead
-    ):
-        cpu_load, ram_load = self._get_load(pods)
-        return (
-            cpu * cpu_load / 100 - len(pods) * cpu_overhead,
-            ram * ram_load / 100 - len(pods) * ram_overhead,
-        )
-
-    def _plot(self):
-        fig, axs = plt.subplots(3, gridspec_kw={"wspace": 0.5, "hspace": 0.5})
-        fig.suptitle("LOADS")
-
-        dates = self._stat_service.memory.keys()
-        vm_cpu_load = [
-            item.vm_cpu_load for _, item in self._stat_service.memory.items()
-        ]
-        vm_ram_load = [
-            item.vm_ram_load for _, item in self._stat_service.memory.items()
-        ]
-        db_cpu_load = [
-            item.db_cpu_load for _, item in self._stat_service.memory.items()
-        ]
-        db_ram_load = [
-            item.db_ram_load for _, item in self._stat_service.memory.items()
-        ]
-
-        axs[0].title.set_text("VM")
-        axs[0].xaxis.set_major_formatter(mdates.DateFormatter("%H:%M:%S"))
-        axs[0].axhline(y=settings.max_load, color="red", linestyle="--")
-        axs[0].axhline(y=settings.pod_load_max, color="orange", linestyle="--")
-
-        axs[0].scatter(dates, vm_cpu_load, color="green", s=10)
-        axs[0].scatter(dates, vm_ram_load, color="blue", s=10)
-
-        axs[0].plot(dates, vm_cpu_load, color="green", label="CPU")
-        axs[0].plot(dates, vm_ram_load, color="blue", label="RAM")
-        axs[0].legend()
-
-        axs[1].title.set_text("DB")
-        axs[1].xaxis.set_major_formatter(mdates.DateFormatter("%H:%M:%S"))
-        axs[1].axhline(y=settings.max_load, color="red", linestyle="--")
-        axs[1].axhline(y=settings.pod_load_max, color="orange", linestyle="--")
-
-        axs[1].scatter(dates, db_cpu_load, color="green", s=10)
-        axs[1].scatter(dates, db_ram_load, color="blue", s=10)
-
-        axs[1].plot(dates, db_cpu_load, color="green", label="CPU")
-        axs[1].plot(dates, db_ram_load, color="blue", label="RAM")
-        axs[1].legend()
-
-        data = [item.requests for _, item in self._stat_service.memory.items()]
-        axs[2].title.set_text("REQUESTS")
-        axs[2].xaxis.set_major_formatter(mdates.DateFormatter("%H:%M:%S"))
-
-        axs[2].scatter(self._stat_service.memory.keys(), data, color="orange", s=10)
-        axs[2].plot(
-            self._stat_service.memory.keys(), data, color="red", label="REQUESTS"
-        )
-
-        axs[2].legend()
-
-        plt.draw()
-        plt.show()
+    def dump_state(self) -> tp.Dict[str, tp.Any]:
+        return {name: getattr(self, name) for name in HISTORIES}
 
-    def _clear_data(self):
-        self.dates = self.dates[-settings.max_data_size :]
-        self.db_cpu_load = self.db_cpu_load[-settings.max_data_size :]
-        self.db_ram_load = self.db_ram_load[-settings.max_data_size :]
-        self.db_cpu_load = self.db_cpu_load[-settings.max_data_size :]
-        self.db_ram_load = self.db_ram_load[-settings.max_data_size :]
+    def load_state(self, state: tp.Dict[str, tp.Any]) -> None:
+        for name, value in state.items():
+            if isinstance(value, RollingStats) and value.size == settings.gap:
+                setattr(self, name, value)
@@ -0,0 +1,111 @@
+import asyncio
+import copy
+import dataclasses
+import logging
+import typing as tp
+
+from src import models
+
+from src.clients.price import PriceClient
+from src.services.fleet import FleetState
+from src.services.latency import LatencyService
+from src.services.mutation import MutationExecutor, Mutation, MutationReport
+from src.services.predict import PredictService
+from src.services.resource import ResourceService
+from src.services.scheduler import SchedulerService, TickInputs
+from src.services.stats import StatsService
+from src.settings import settings
+from src.workers import WorkerPool
+
+
+logger = logging.getLogger(__name__)
+
+
+class RecordingExecutor(MutationExecutor):
+    dry_run = True
+
+    def __init__(self, resource_service: ResourceService, name: str) -> None:
+        super().__init__(resource_service)
+        self.name: str = name
+
+    async def execute(
+        self,
+        mutations: tp.List[Mutation],
+        known_resources: tp.List[models.GetResource],
+    ) -> MutationReport:
+        if mutations:
+            logger.info(
+                f"#shadow: policy = [{self.name}], "
+                f"would apply = [{', '.join(str(item) for item in mutations)}]"
+            )
+        return MutationReport(skipped=list(mutations))
+
+
+@dataclasses.dataclass
+class ShadowPolicy:
+    name: str
+    overrides: tp.Dict[str, tp.Any]
+    scheduler: SchedulerService
+    fleet_state: FleetState
+    predict_service: PredictService
+
+
+class ShadowService:
+    def __init__(
+        self,
+        price_client: PriceClient,
+        resource_service: ResourceService,
+        stats_service: StatsService,
+        fleet_state: FleetState,
+        latency_service: LatencyService,
+        workers: WorkerPool,
+    ) -> None:
+        self._fleet_state: FleetState = fleet_state
+        self._workers: WorkerPool = workers
+
+        self.policies: tp.List[ShadowPolicy] = []
+        for name, overrides in settings.shadow_policies.items():
+            with settings.override(**overrides):
+                shadow_fleet = FleetState(clock=fleet_state.now)
+                predict_service = PredictService(stats_service)
+                scheduler = SchedulerService(
+                    price_client=price_client,
+                    resource_service=resource_service,
+                    stat_service=stats_service,
+                    predict_service=predict_service,
+                    mutation_executor=RecordingExecutor(resource_service, name),
+                    fleet_state=shadow_fleet,
+                    latency_service=latency_service,
+                    workers=workers,
+                    name=name,
+                )
+            self.policies.append(
+                ShadowPolicy(name, overrides, scheduler, shadow_fleet, predict_service)
+            )
+
+    async def capture(self) -> None:
+        if not self.policies:
+            return None
+
+        state = self._fleet_state.dump_state()
+        for policy in self.policies:
+            policy.fleet_state.load_state(copy.deepcopy(state))
+        await asyncio.gather(*(self._predict(policy) for policy in self.policies))
+
+    async def run(self, inputs: TickInputs) -> None:
+        await asyncio.gather(*(self._run(policy, inputs) for policy in self.policies))
+
+    async def _predict(self, policy: ShadowPolicy) -> None:
+        with settings.override(**policy.overrides):
+            try:
+                await self._workers.run(policy.predict_service.predict)
+            except Exception as exc:
+                logger.error(f"Shadow predict failed. Policy: {policy.name}, error: {exc}")
+
+    @staticmethod
+    async def _run(policy: ShadowPolicy, inputs: TickInputs) -> None:
+        with settings.override(**policy.overrides):
+            try:
+                await policy.scheduler.decide(inputs)
+            except Exception as exc:
+                logger.error(f"Shadow failed. Policy: {policy.name}, error: {exc}")
@@ -1,8 +1,7 @@
 import logging
+import math
 import os
 import pickle
-
-import numpy as np
 import typing as tp
 
 from collections import OrderedDict
@@ -11,19 +10,36 @@ from src import models
 from src import utils
 
 from src.clients.stats import StatsClient
+from src.estimator import RecursiveLeastSquares
 from src.settings import settings
 
 
 logger = logging.getLogger(__name__)
 
 
-def _cal_percent(base, perc):
-    return (base * perc) / 100
+COEFFICIENTS = (
+    "vm_cpu_overhead",
+    "vm_ram_overhead",
+    "vm_cpu_request",
+    "vm_ram_request",
+    "db_cpu_overhead",
+    "db_ram_overhead",
+    "db_cpu_request",
+    "db_ram_request",
+)
+
+
+ESTIMATORS = (
+    (models.ResourceType.VM, "vm_cpu"),
+    (models.ResourceType.VM, "vm_ram"),
+    (models.ResourceType.DB, "db_cpu"),
+    (models.ResourceType.DB, "db_ram"),
+)
 
 
 class StatsService:
     _stats_client: StatsClient
-    memory: OrderedDict[models.Stat] = {}
+    memory: OrderedDict[models.Stat]
 
     vm_cpu_overhead: float = 0.05
     vm_ram_overhead: float = 0.3
@@ -43,8 +59,20 @@ class StatsService:
 
     def __init__(self, stats_client: StatsClient) -> None:
         self._stats_client: StatsClient = stats_client
+        self.memory = OrderedDict()
+        self.estimators: tp.Dict[str, RecursiveLeastSquares] = {
+            name: RecursiveLeastSquares(
+                prior=[
+                    getattr(self, f"{name}_overhead"),
+                    getattr(self, f"{name}_request"),
+                ],
+                forgetting=settings.estimator_forgetting,
+                huber=settings.estimator_huber,
+            )
+            for _, name in ESTIMATORS
+        }
 
-    async def update_stats(self, prices) -> None:
+    async def update_stats(self, resources: tp.List[models.GetResource]) -> None:
         stat = await self._stats_client.get()
         if not stat:
             return None
@@ -53,7 +81,7 @@ class StatsService:
             self.memory.pop(next(iter(self.memory)))
 
         self.memory[stat.timestamp] = stat
-        self._calculate_overhead(prices)
+        self._update_coefficients(stat, resources)
         logger.info(f"Memory size: {len(self.memory)}")
         if not settings.prod:
             self._save_memory()
@@ -63,76 +91,61 @@ class StatsService:
             return None
         return self.memory[next(iter(reversed(self.memory)))]
 
-    def _calculate_overhead(self, prices):
-        if len(self.memory) < 2:
-            return None
-
-        res_iter = iter(reversed(self.memory))
-
-        first_item = self.memory[next(res_iter)]
-        second_item = self.memory[next(res_iter)]
-
-        if (
-            first_item.vm_cpu_load == 0
-            or first_item.vm_ram_load == 0
-            or first_item.db_cpu_load == 0
-            or first_item.db_ram_load == 0
-            or second_item.vm_cpu_load == 0
-            or second_item.vm_ram_load == 0
-            or second_item.db_cpu_load == 0
-            or second_item.db_ram_load == 0
-        ):
-            self.is_overhead_calc = False
-            return None
-
-        f_vm_cnt = len(
-            utils.choose_resource(
-                prices[models.ResourceType.VM], first_item.vm_cpu, first_item.vm_ram
-            )
+    def _update_coefficients(
+        self, stat: models.Stat, resources: tp.List[models.GetResource]
+    ) -> None:
+        for resource_type, name in ESTIMATORS:
+            capacity, load = getattr(stat, name), getattr(stat, f"{name}_load")
+            if load == 0 or capacity <= 0:
+                continue
+            pod_count = self._pod_count(resources, resource_type, stat)
+            if not pod_count:
+                continue
+
+            estimator = self.estimators[name]
+            estimator.update([pod_count, stat.requests], capacity * load / 100)
+            overhead, request = estimator.theta
+            if overhead >= 0 and request >= 0:
+                setattr(self, f"{name}_overhead", float(overhead))
+                setattr(self, f"{name}_request", float(request))
+
+        self.is_overhead_calc = all(
+            item.count >= settings.estimator_min_samples
+            for item in self.estimators.values()
         )
-        f_db_cnt = len(
-            utils.choose_resource(
-                prices[models.ResourceType.DB], first_item.db_cpu, first_item.db_ram
-            )
+        logger.info(
+            "Coefficients (overhead, request) 95%% CI: %s",
+            {
+                name: [(round(low, 4), round(high, 4)) for low, high in interval]
+                for name, interval in self.confidence_intervals().items()
+            },
         )
 
-        s_vm_cnt = len(
-            utils.choose_resource(
-                prices[models.ResourceType.VM], second_item.vm_cpu, second_item.vm_ram
-            )
-        )
-        s_db_cnt = len(
-            utils.choose_resource(
-                prices[models.ResourceType.DB], second_item.db_cpu, second_item.db_ram
-            )
-        )
-
-        result = []
-        data = (
-            (f_vm_cnt, s_vm_cnt, "vm_cpu", "vm_cpu_load",),
-            (f_vm_cnt, s_vm_cnt, "vm_ram", "vm_ram_load",),
-            (f_db_cnt, s_db_cnt, "db_cpu", "db_cpu_load",),
-            (f_db_cnt, s_db_cnt, "db_ram", "db_ram_load",),
-        )
-        for f_cnt, s_cnt, res, load in data:
-            m = np.array([[f_cnt, first_item.requests], [s_cnt, second_item.requests]])
-            v = np.array(
-                [
-                    _cal_percent(getattr(first_item, res), getattr(first_item, load)),
-                    _cal_percent(getattr(second_item, res), getattr(second_item, load)),
-                ]
-            )
-            over, request = np.linalg.solve(m, v)
-            result.append([over.item(), request.item()])
-
-        if any(x[0] < 0 or x[1] < 0 for x in result):
-            return None
-
-        self.vm_cpu_overhead, self.vm_cpu_request = result[0]
-        self.vm_ram_overhead, self.vm_ram_request = result[1]
-        self.db_cpu_overhead, self.db_cpu_request = result[2]
-        self.db_ram_overhead, self.db_ram_request = result[3]
-        self.is_overhead_calc = True
+    @staticmethod
+    def _pod_count(
+        resources: tp.List[models.GetResource],
+        resource_type: models.ResourceType,
+        stat: models.Stat,
+    ) -> tp.Optional[int]:
+        prefix = resource_type.value
+        cpu, ram = getattr(stat, f"{prefix}_cpu"), getattr(stat, f"{prefix}_ram")
+
+        pods = [pod for pod in resources if pod.type == resource_type]
+        active_pods = [pod for pod in pods if not pod.failed]
+        for group in (active_pods, pods):
+            if math.isclose(sum(pod.cpu for pod in group), cpu) and math.isclose(
+                sum(pod.ram for pod in group), ram
+            ):
+                return len(group)
+        return None
+
+    def confidence_intervals(
+        self, z: float = 1.96
+    ) -> tp.Dict[str, tp.List[tp.Tuple[float, float]]]:
+        return {
+            name: estimator.confidence_interval(z)
+            for name, estimator in self.estimators.items()
+        }
 
     def get_overhead(self, resource_type):
         if resource_type == models.ResourceType.VM:
@@ -145,12 +158,19 @@ class StatsService:
     def _get_db_overhead(self):
         return self.db_cpu_overhead, self.db_ram_overhead
 
-    def get_need_resource(self, prices, resource_type, requests: int):
+    def get_request(self, resource_type):
         if resource_type == models.ResourceType.VM:
-            return self._get_vm_resource(prices, requests)
-        return self._get_db_resource(prices, requests)
+            return self.vm_cpu_request, self.vm_ram_request
+        return self.db_cpu_request, self.db_ram_request
 
-    def _get_vm_resource(self, prices, requests: int):
+    def get_need_resource(
+        self, prices, resource_type, requests: int, load_cap: tp.Optional[float] = None
+    ):
+        if resource_type == models.ResourceType.VM:
+            return self._get_vm_resource(prices, requests, load_cap)
+        return self._get_db_resource(prices, requests, load_cap)
+
+    def _get_vm_resource(self, prices, requests: int, load_cap: tp.Optional[float]):
         return utils.choose_optimal_resources(
             prices,
             requests,
@@ -158,9 +178,10 @@ class StatsService:
             self.vm_ram_request,
             self.vm_cpu_overhead,
             self.vm_ram_overhead,
+            load_cap,
         )
 
-    def _get_db_resource(self, prices, requests: int):
+    def _get_db_resource(self, prices, requests: int, load_cap: tp.Optional[float]):
         return utils.choose_optimal_resources(
             prices,
             requests,
@@ -168,8 +189,24 @@ class StatsService:
             self.db_ram_request,
             self.db_cpu_overhead,
             self.db_ram_overhead,
+            load_cap,
         )
 
+    def dump_state(self) -> tp.Dict[str, tp.Any]:
+        return {
+            "memory": self.memory,
+            "coefficients": {name: getattr(self, name) for name in COEFFICIENTS},
+            "is_overhead_calc": self.is_overhead_calc,
+            "estimators": self.estimators,
+        }
+
+    def load_state(self, state: tp.Dict[str, tp.Any]) -> None:
+        self.memory = OrderedDict(state["memory"])
+        for name, value in state["coefficients"].items():
+            setattr(self, name, value)
+        self.is_overhead_calc = state["is_overhead_calc"]
+        self.estimators = state["estimators"]
+
     def _save_memory(self):
         with open(self.PATH, "wb") as f:
             pickle.dump(self.memory, f)
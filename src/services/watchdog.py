@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+import typing as tp
+
+from src import models
+from src import utils
+
+from src.clients.price import PriceClient
+from src.clients.stats import StatsClient
+from src.services.fleet import FleetState
+from src.services.mutation import Mutation, MutationExecutor, MutationKind
+from src.services.resource import ResourceService
+from src.settings import settings
+from src.workers import WorkerPool
+
+
+logger = logging.getLogger(__name__)
+
+
+class WatchdogService:
+    _stats_client: StatsClient
+    _price_client: PriceClient
+    _resource_service: ResourceService
+    _mutation_executor: MutationExecutor
+    _fleet_state: FleetState
+    _workers: WorkerPool
+
+    def __init__(
+        self,
+        stats_client: StatsClient,
+        price_client: PriceClient,
+        resource_service: ResourceService,
+        mutation_executor: MutationExecutor,
+        fleet_state: FleetState,
+        workers: WorkerPool,
+    ) -> None:
+        self._stats_client: StatsClient = stats_client
+        self._price_client: PriceClient = price_client
+        self._resource_service: ResourceService = resource_service
+        self._mutation_executor: MutationExecutor = mutation_executor
+        self._fleet_state: FleetState = fleet_state
+        self._workers: WorkerPool = workers
+
+        self.plans: tp.Dict[models.ResourceType, tp.List[models.Price]] = {}
+        self._planned_at: float = 0
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.watchdog_second)
+            try:
+                await self.check()
+            except Exception as exc:
+                logger.error(f"Watchdog failed: {exc}")
+
+    async def check(self) -> None:
+        if not self._resource_service.is_active:
+            return None
+
+        if time.monotonic() - self._planned_at >= settings.sleep_second:
+            await self.prepare()
+
+        stat = await self._stats_client.get()
+        if stat is None:
+            return None
+
+        for resource_type in self._endangered(stat):
+            await self._scale_up(resource_type, stat)
+
+    async def prepare(self) -> None:
+        prices = self._price_client.prices
+        if not prices:
+            return None
+
+        now = self._fleet_state.now()
+        for resource_type, items in prices.items():
+            cpu, ram, _ = self._fleet_state.effective_capacity(resource_type, now)
+            plan = await self._workers.run(
+                utils.choose_resource,
+                items,
+                cpu * settings.emergency_scale,
+                ram * settings.emergency_scale,
+            )
+            self.plans[resource_type] = plan or [min(items, key=lambda x: x.cost)]
+        self._planned_at = time.monotonic()
+
+    @staticmethod
+    def _endangered(stat: models.Stat) -> tp.List[models.ResourceType]:
+        result = []
+        if max(stat.vm_cpu_load, stat.vm_ram_load) >= settings.danger_load:
+            result.append(models.ResourceType.VM)
+        if max(stat.db_cpu_load, stat.db_ram_load) >= settings.danger_load:
+            result.append(models.ResourceType.DB)
+
+        if not result and stat.response_time >= settings.danger_response_time:
+            result.append(
+                models.ResourceType.VM
+                if stat.vm_cpu_load >= stat.db_cpu_load
+                else models.ResourceType.DB
+            )
+        return result
+
+    async def _scale_up(
+        self, resource_type: models.ResourceType, stat: models.Stat
+    ) -> None:
+        plan = self.plans.get(resource_type)
+        if not plan:
+            return None
+
+        async with self._fleet_state.lock:
+            if any(
+                item.mutation.kind == MutationKind.CREATE
+                for item in self._fleet_state.in_flight(resource_type)
+            ):
+                return None
+
+            logger.warning(
+                "#watchdog: type = [%s], vm load = [%s/%s], db load = [%s/%s], "
+                "response time = [%s], create = [%s]",
+                resource_type,
+                stat.vm_cpu_load,
+                stat.vm_ram_load,
+                stat.db_cpu_load,
+                stat.db_ram_load,
+                stat.response_time,
+                len(plan),
+            )
+            report = await self._mutation_executor.execute(
+                [Mutation.create(resource_type, price) for price in plan],
+                list(self._fleet_state.pods.values()),
+            )
+            self._fleet_state.record(report)
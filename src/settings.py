@@ -1,28 +1,146 @@
+import contextlib
+import contextvars
+import typing as tp
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     host: str = "https://mts-olimp-cloud.codenrock.com/"
     token: str = "TOKEN"
+    tokens: tp.List[str] = []
+
+    workers: int = 4
+    http_max_connections: int = 100
+    http_timeout_second: float = 10
+    price_cache_second: int = 60
+
+    boot_second: int = 300
+    resize_second: int = 180
+
+    watchdog: bool = False
+    watchdog_second: float = 2
+    danger_load: int = 92
+    danger_response_time: int = 350
+    emergency_scale: float = 0.5
+    consolidation: bool = False
+    consolidation_second: float = 60
+    consolidation_ticks: int = 3
+    consolidation_load: float = 60
+    consolidation_volatility: float = 0.05
+    consolidation_saving: float = 0.1
+    consolidation_payback_minute: float = 30
+
+    mutation_concurrency: int = 4
+    mutation_retries: int = 3
+    mutation_backoff_second: float = 0.5
+
+    ha: bool = False
+    lease_backend: str = "file"
+    lease_dir: str = "/tmp"
 
     max_load: int = 95
     pod_load_max: int = 90
     delta: float = 0.2
     gap: int = 4
+    ewma_alpha: float = 0.3
     penalty: float = 0.001
+    forecast_models: tp.List[str] = ["arima", "holt", "moving_average", "naive"]
+    forecast_mode: str = "best"
+    forecast_horizon: int = 6
+    forecast_window: int = 20
+    response_time_limit: float = 400
+    latency_z: float = 2.0
+    latency_bump: float = 1.25
+    latency_bumps: int = 4
+    offline_probability: float = 0.05
+    risk_levels: tp.List[float] = [0.05, 0.02, 0.01, 0.001]
+    offline_minute_cost: float = 100
 
     sleep_second: int = 15
+    adaptive_sleep: bool = True
+    min_sleep_second: float = 5
+    max_sleep_second: float = 45
+    cadence_headroom: float = 30
+    cadence_volatility: float = 0.1
     memory_size: int = 100
 
     train_size: int = 120
     max_data_size: int = 500
 
     min_memory_size: int = 11
+
+    estimator_forgetting: float = 0.98
+    estimator_huber: float = 2.0
+    estimator_min_samples: int = 5
     prod: bool = True
+    warm_up: bool = True
+
+    checkpoint: bool = True
+    checkpoint_path: str = "checkpoint.pickle"
+    checkpoint_second: int = 30
+    checkpoint_max_age_second: int = 600
+    checkpoint_history_age_second: int = 120
+
+    plot: bool = False
+    plot_second: int = 60
+    plot_path: str = "dashboard"
+    plot_formats: tp.List[str] = ["png"]
+
+    shadow_policies: tp.Dict[str, tp.Dict[str, tp.Any]] = {}
+
+    log_level: str = "INFO"
+    log_json: bool = False
+    log_rate: float = 1
+    log_burst: int = 10
+    log_sample: tp.Dict[str, float] = {}
+    log_exempt: tp.List[str] = [
+        "#decision",
+        "#watchdog",
+        "#consolidate",
+        "#shadow",
+        "#skipInFlight",
+        "src.services.mutation",
+        "src.clients.resource",
+    ]
+
+    @property
+    def tenant_tokens(self) -> tp.List[str]:
+        return self.tokens or [self.token]
 
     @property
     def pod_load_max_percent(self):
         return self.pod_load_max / 100
 
 
-settings = Settings()
+_overrides: contextvars.ContextVar[tp.Dict[str, tp.Any]] = contextvars.ContextVar(
+    "settings_overrides", default={}
+)
+
+
+class SettingsProxy:
+    def __init__(self, base: Settings) -> None:
+        object.__setattr__(self, "_base", base)
+
+    def __getattr__(self, name: str) -> tp.Any:
+        overrides = _overrides.get()
+        if name in overrides:
+            return overrides[name]
+        attribute = getattr(Settings, name, None)
+        if isinstance(attribute, property):
+            return attribute.fget(self)
+        return getattr(self._base, name)
+
+    def __setattr__(self, name: str, value: tp.Any) -> None:
+        setattr(self._base, name, value)
+
+    @contextlib.contextmanager
+    def override(self, **values: tp.Any) -> tp.Iterator[None]:
+        token = _overrides.set({**_overrides.get(), **values})
+        try:
+            yield
+        finally:
+            _overrides.reset(token)
+
+
+settings: Settings = tp.cast(Settings, SettingsProxy(Settings()))
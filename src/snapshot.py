@@ -0,0 +1,94 @@
+import typing as tp
+
+import numpy as np
+
+from src import models
+from src.settings import settings
+
+
+TYPES: tp.Tuple[models.ResourceType, ...] = tuple(models.ResourceType)
+TYPE_CODES: tp.Dict[models.ResourceType, int] = {
+    item: code for code, item in enumerate(TYPES)
+}
+
+
+class FleetSnapshot:
+    def __init__(self, resources: tp.List[models.GetResource]) -> None:
+        count = len(resources)
+        self.resources: tp.List[models.GetResource] = resources
+
+        self.id = np.fromiter((r.id for r in resources), np.int64, count)
+        self.type = np.fromiter((TYPE_CODES[r.type] for r in resources), np.int8, count)
+        self.cpu = np.fromiter((r.cpu for r in resources), np.float64, count)
+        self.ram = np.fromiter((r.ram for r in resources), np.float64, count)
+        self.cpu_load = np.fromiter((r.cpu_load for r in resources), np.float64, count)
+        self.ram_load = np.fromiter((r.ram_load for r in resources), np.float64, count)
+        self.failed = np.fromiter((r.failed for r in resources), np.bool_, count)
+        self.failed_until = np.fromiter(
+            (r.failed_until.timestamp() for r in resources), np.float64, count
+        )
+        self.cost = np.fromiter((r.cost for r in resources), np.float64, count)
+
+        active = ~self.failed
+        size = len(TYPES)
+        self._count = np.bincount(self.type, minlength=size)
+        self._active_count = np.bincount(self.type[active], minlength=size)
+        self._cpu = np.bincount(self.type[active], self.cpu[active], size)
+        self._ram = np.bincount(self.type[active], self.ram[active], size)
+        self._cpu_load = np.bincount(
+            self.type[active], (self.cpu_load * self.cpu)[active], size
+        )
+        self._ram_load = np.bincount(
+            self.type[active], (self.ram_load * self.ram)[active], size
+        )
+        self._cost = np.bincount(self.type, self.cost, size)
+        self._total_cpu = np.bincount(self.type, self.cpu, size)
+        self._total_ram = np.bincount(self.type, self.ram, size)
+
+    def __len__(self) -> int:
+        return len(self.resources)
+
+    def pods(self, resource_type: models.ResourceType) -> tp.List[models.GetResource]:
+        indexes = np.flatnonzero(self.type == TYPE_CODES[resource_type])
+        return [self.resources[i] for i in indexes]
+
+    def count(self, resource_type: models.ResourceType) -> int:
+        return int(self._count[TYPE_CODES[resource_type]])
+
+    def active_count(self, resource_type: models.ResourceType) -> int:
+        return int(self._active_count[TYPE_CODES[resource_type]])
+
+    def capacity(self, resource_type: models.ResourceType) -> tp.Tuple[float, float]:
+        code = TYPE_CODES[resource_type]
+        return float(self._cpu[code]), float(self._ram[code])
+
+    def total_capacity(
+        self, resource_type: models.ResourceType
+    ) -> tp.Tuple[float, float]:
+        code = TYPE_CODES[resource_type]
+        return float(self._total_cpu[code]), float(self._total_ram[code])
+
+    def load(self, resource_type: models.ResourceType) -> tp.Tuple[float, float]:
+        code = TYPE_CODES[resource_type]
+        return float(self._cpu_load[code]), float(self._ram_load[code])
+
+    def abs_load(
+        self,
+        resource_type: models.ResourceType,
+        cpu_overhead: float,
+        ram_overhead: float,
+    ) -> tp.Tuple[float, float]:
+        cpu, ram = self.capacity(resource_type)
+        cpu_load, ram_load = self.load(resource_type)
+        count = self.active_count(resource_type)
+        return (
+            cpu * cpu_load / 100 - count * cpu_overhead,
+            ram * ram_load / 100 - count * ram_overhead,
+        )
+
+    def is_offline(self, resource_type: models.ResourceType) -> bool:
+        cpu_load, ram_load = self.load(resource_type)
+        return cpu_load >= settings.max_load or ram_load >= settings.max_load
+
+    def cost_total(self, resource_type: models.ResourceType) -> float:
+        return float(self._cost[TYPE_CODES[resource_type]])
@@ -0,0 +1,49 @@
+import asyncio
+import importlib
+import logging
+import sys
+import time
+import typing as tp
+
+
+logger = logging.getLogger(__name__)
+
+STARTED_AT = time.perf_counter()
+
+HEAVY_MODULES = ("pulp", "pandas", "pmdarima", "matplotlib")
+WARM_UP_MODULES = ("pulp", "pmdarima")
+
+
+def elapsed() -> float:
+    return time.perf_counter() - STARTED_AT
+
+
+def report_startup() -> tp.List[str]:
+    eager = [name for name in HEAVY_MODULES if name in sys.modules]
+    logger.info(f"Startup: ready in {elapsed():.3f}s")
+    if eager:
+        logger.warning(f"Startup: heavy modules imported eagerly: {eager}")
+    return eager
+
+
+def warm_up(modules: tp.Iterable[str] = WARM_UP_MODULES) -> tp.Dict[str, float]:
+    report = {}
+    for name in modules:
+        started_at = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as exc:
+            logger.error(f"Warm-up: failed import {name}: {exc}")
+            continue
+        report[name] = time.perf_counter() - started_at
+
+    logger.info(
+        "Warm-up: "
+        + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in report.items())
+        + f"; done at {elapsed():.3f}s"
+    )
+    return report
+
+
+async def warm_up_background() -> tp.Dict[str, float]:
+    return await asyncio.to_thread(warm_up)
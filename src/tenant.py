@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import logging
+import os
+import typing as tp
+
+import httpx
+
+from src import startup
+from src.clients.price import PriceClient
+from src.clients.resource import ResourceClient
+from src.clients.stats import StatsClient
+from src.services.cadence import CadencePolicy
+from src.services.checkpoint import CheckpointService
+from src.services.consolidation import ConsolidationService
+from src.services.dashboard import DashboardService
+from src.services.fleet import FleetState
+from src.services.latency import LatencyService
+from src.services.leader import LeaderElection, create_lease_backend
+from src.services.mutation import MutationExecutor
+from src.services.predict import PredictService
+from src.services.resource import ResourceService
+from src.services.scheduler import SchedulerService
+from src.services.shadow import ShadowService
+from src.services.stats import StatsService
+from src.services.watchdog import WatchdogService
+from src.settings import settings
+from src.workers import WorkerPool
+
+
+logger = logging.getLogger(__name__)
+
+
+def tenant_name(token: str) -> str:
+    return hashlib.sha1(token.encode()).hexdigest()[:8]
+
+
+def tenant_path(path: str, name: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}-{name}{ext}"
+
+
+class Tenant:
+    def __init__(
+        self,
+        token: str,
+        http_client: httpx.AsyncClient,
+        price_client: PriceClient,
+        workers: WorkerPool,
+    ) -> None:
+        self.name: str = tenant_name(token)
+
+        self.leader: tp.Optional[LeaderElection] = None
+        if settings.ha:
+            self.leader = LeaderElection(
+                create_lease_backend(settings.lease_backend), self.name
+            )
+
+        stats_client = StatsClient(http_client, token)
+        self.stats_service: StatsService = StatsService(stats_client)
+        self.predict_service: PredictService = PredictService(self.stats_service)
+        self.resource_service: ResourceService = ResourceService(
+            price_client=price_client,
+            resource_client=ResourceClient(http_client, token),
+            leader=self.leader,
+        )
+        self.fleet_state: FleetState = FleetState()
+        self.latency_service: LatencyService = LatencyService(self.stats_service)
+        mutation_executor = MutationExecutor(self.resource_service)
+        self.scheduler_service: SchedulerService = SchedulerService(
+            resource_service=self.resource_service,
+            price_client=price_client,
+            stat_service=self.stats_service,
+            predict_service=self.predict_service,
+            mutation_executor=mutation_executor,
+            fleet_state=self.fleet_state,
+            latency_service=self.latency_service,
+            workers=workers,
+        )
+        self.shadow_service: ShadowService = ShadowService(
+            price_client=price_client,
+            resource_service=self.resource_service,
+            stats_service=self.stats_service,
+            fleet_state=self.fleet_state,
+            latency_service=self.latency_service,
+            workers=workers,
+        )
+        self.cadence_policy: CadencePolicy = CadencePolicy(
+            self.stats_service, self.scheduler_service, self.fleet_state
+        )
+        self.watchdog_service: WatchdogService = WatchdogService(
+            stats_client=stats_client,
+            price_client=price_client,
+            resource_service=self.resource_service,
+            mutation_executor=mutation_executor,
+            fleet_state=self.fleet_state,
+            workers=workers,
+        )
+        self.consolidation_service: ConsolidationService = ConsolidationService(
+            price_client=price_client,
+            resource_service=self.resource_service,
+            stats_service=self.stats_service,
+            predict_service=self.predict_service,
+            scheduler_service=self.scheduler_service,
+            mutation_executor=mutation_executor,
+            fleet_state=self.fleet_state,
+            workers=workers,
+        )
+        self.checkpoint_service: CheckpointService = CheckpointService(
+            stats_service=self.stats_service,
+            predict_service=self.predict_service,
+            scheduler_service=self.scheduler_service,
+            fleet_state=self.fleet_state,
+            latency_service=self.latency_service,
+            price_client=price_client,
+            path=tenant_path(settings.checkpoint_path, self.name),
+        )
+        self.background_tasks: tp.List[asyncio.Task] = []
+
+    @property
+    def is_leader(self) -> bool:
+        return self.leader is None or self.leader.is_leader
+
+    def refresh_leadership(self) -> None:
+        if self.leader is None:
+            return None
+        was_leader = self.leader.is_leader
+        if self.leader.refresh() and not was_leader and settings.checkpoint:
+            self.checkpoint_service.restore_fleet()
+
+    async def run(self, delay: float = 0) -> None:
+        if settings.checkpoint:
+            self.checkpoint_service.restore()
+        if not settings.prod:
+            self.stats_service.load_memory()
+
+        if settings.plot:
+            dashboard = DashboardService(
+                self.stats_service, tenant_path(settings.plot_path, self.name)
+            )
+            self.background_tasks.append(asyncio.create_task(dashboard.run()))
+        if settings.watchdog:
+            self.background_tasks.append(
+                asyncio.create_task(self.watchdog_service.run())
+            )
+        if settings.consolidation:
+            self.background_tasks.append(
+                asyncio.create_task(self.consolidation_service.run())
+            )
+
+        first_tick = True
+        while True:
+            self.refresh_leadership()
+            try:
+                inputs = await self.scheduler_service.collect()
+                await self.shadow_service.capture()
+                await self.scheduler_service.decide(inputs)
+                await self.shadow_service.run(inputs)
+            except Exception as exc:
+                logger.error(f"Task failed. Tenant: {self.name}, error: {exc}")
+            if settings.checkpoint and self.is_leader:
+                self.checkpoint_service.maybe_save()
+            if first_tick:
+                logger.info(
+                    f"Startup: first tick done in {startup.elapsed():.3f}s. "
+                    f"Tenant: {self.name}"
+                )
+                first_tick = False
+                await asyncio.sleep(delay)
+            await asyncio.sleep(self.cadence_policy.interval())
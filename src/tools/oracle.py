@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import csv
+import dataclasses
+import datetime
+import logging
+import math
+import sys
+import typing as tp
+import warnings
+
+from src import models
+from src.settings import settings
+from src.tools.simulator import (
+    DEMAND,
+    MAX_LOAD,
+    SimulationResult,
+    Trace,
+    load_prices,
+    load_stats,
+    simulate,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class OracleResult:
+    status: str
+    cost: float
+    interval_cost: tp.List[float]
+
+
+@dataclasses.dataclass
+class RunCost:
+    interval_cost: tp.List[float]
+    interval_offline: tp.List[float]
+
+
+def bucket_requests(
+    trace: Trace, start: datetime.datetime, interval: float, count: int
+) -> tp.List[float]:
+    result: tp.List[tp.Optional[float]] = [None] * count
+    for timestamp, requests in trace:
+        index = min(int((timestamp - start).total_seconds() // interval), count - 1)
+        result[index] = max(result[index] or 0.0, requests)
+
+    last = 0.0
+    for index, value in enumerate(result):
+        last = value if value is not None else last
+        result[index] = last
+    return result
+
+
+def solve_type(
+    resource_type: models.ResourceType,
+    prices: tp.List[models.Price],
+    demand: tp.List[float],
+    interval: float,
+    time_limit: tp.Optional[int] = None,
+) -> OracleResult:
+    from pulp import PULP_CBC_CMD, LpMinimize, LpProblem, LpStatus, LpVariable
+    from pulp import lpSum, value
+
+    request_cpu, request_ram, overhead_cpu, overhead_ram = DEMAND[resource_type]
+    load_cap = MAX_LOAD / 100
+    boot = math.ceil(settings.boot_second / interval)
+    resize = math.ceil(settings.resize_second / interval)
+
+    shapes = range(len(prices))
+    ticks = range(len(demand))
+    model = LpProblem(f"Oracle_{resource_type.value}", LpMinimize)
+
+    initial = LpVariable.dicts("initial", shapes, 0, cat="Integer")
+    create = LpVariable.dicts("create", (shapes, ticks), 0, cat="Integer")
+    delete = LpVariable.dicts("delete", (shapes, ticks), 0, cat="Integer")
+    alive = LpVariable.dicts("alive", (shapes, ticks), 0, cat="Integer")
+    change = {
+        (a, b, t): LpVariable(f"resize_{a}_{b}_{t}", 0, cat="Integer")
+        for a in shapes
+        for b in shapes
+        if a != b
+        for t in ticks
+    }
+
+    ready = {}
+    for s in shapes:
+        for t in ticks:
+            previous = alive[s][t - 1] if t else initial[s]
+            model += alive[s][t] == (
+                previous
+                + create[s][t]
+                - delete[s][t]
+                + lpSum(change[a, s, t] for a in shapes if a != s)
+                - lpSum(change[s, b, t] for b in shapes if b != s)
+            )
+            ready[s, t] = (
+                alive[s][t]
+                - lpSum(create[s][k] for k in range(max(t - boot + 1, 0), t + 1))
+                - lpSum(
+                    change[a, s, k]
+                    for a in shapes
+                    if a != s
+                    for k in range(max(t - resize + 1, 0), t + 1)
+                )
+            )
+            model += ready[s, t] >= 0
+
+    for t in ticks:
+        model += (
+            lpSum(
+                ready[s, t] * (load_cap * prices[s].cpu - overhead_cpu) for s in shapes
+            )
+            >= demand[t] * request_cpu
+        )
+        model += (
+            lpSum(
+                ready[s, t] * (load_cap * prices[s].ram - overhead_ram) for s in shapes
+            )
+            >= demand[t] * request_ram
+        )
+        model += lpSum(ready[s, t] for s in shapes) >= 1
+
+    minutes = interval / 60
+    model += lpSum(
+        alive[s][t] * prices[s].cost * minutes for s in shapes for t in ticks
+    )
+    model.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit))
+
+    interval_cost = [
+        sum((value(alive[s][t]) or 0) * prices[s].cost for s in shapes) * minutes
+        for t in ticks
+    ]
+    return OracleResult(LpStatus[model.status], sum(interval_cost), interval_cost)
+
+
+def solve(
+    trace: Trace,
+    prices: tp.List[models.Price],
+    interval: float,
+    time_limit: tp.Optional[int] = None,
+) -> tp.Tuple[OracleResult, tp.List[float]]:
+    start = trace[0][0]
+    count = max(math.ceil((trace[-1][0] - start).total_seconds() / interval), 1)
+    demand = bucket_requests(trace, start, interval, count)
+
+    status, interval_cost = [], [0.0] * count
+    for resource_type in DEMAND:
+        result = solve_type(
+            resource_type,
+            [item for item in prices if item.type == resource_type],
+            demand,
+            interval,
+            time_limit,
+        )
+        logger.info(f"Oracle: type = {resource_type.value}, status = {result.status}")
+        status.append(result.status)
+        interval_cost = [a + b for a, b in zip(interval_cost, result.interval_cost)]
+
+    overall = "Optimal" if all(item == "Optimal" for item in status) else "/".join(status)
+    return OracleResult(overall, sum(interval_cost), interval_cost), demand
+
+
+def recorded_run(
+    stats: tp.List[models.Stat], interval: float, count: int
+) -> RunCost:
+    start = stats[0].timestamp
+    cost, offline = [0.0] * count, [0.0] * count
+    for previous, current in zip(stats, stats[1:]):
+        index = min(
+            int((previous.timestamp - start).total_seconds() // interval), count - 1
+        )
+        cost[index] += max(current.cost_total - previous.cost_total, 0)
+        offline[index] += max(current.offline_time - previous.offline_time, 0)
+    return RunCost(cost, offline)
+
+
+def simulated_run(
+    result: SimulationResult, start: datetime.datetime, interval: float, count: int
+) -> RunCost:
+    cost, offline = [0.0] * count, [0.0] * count
+    for item in result.intervals:
+        index = min(int((item.start - start).total_seconds() // interval), count - 1)
+        cost[index] += item.cost
+        offline[index] += item.offline_second / 60
+    return RunCost(cost, offline)
+
+
+def main(argv: tp.Optional[tp.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Hindsight-optimal fleet cost for a recorded trace"
+    )
+    parser.add_argument("trace", help="memory or checkpoint pickle with stats")
+    parser.add_argument("--prices", required=True, help="JSON price catalog")
+    parser.add_argument("--interval", type=float, default=60)
+    parser.add_argument("--time-limit", type=int, default=None)
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="compare with a simulated SchedulerService run instead of the recorded one",
+    )
+    parser.add_argument("--csv", default=None, help="write per-interval regret here")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("src.services").setLevel(logging.WARNING)
+
+    stats = load_stats(args.trace)
+    trace = [(stat.timestamp, float(stat.requests)) for stat in stats]
+    prices = load_prices(args.prices)
+
+    oracle, demand = solve(trace, prices, args.interval, args.time_limit)
+    count = len(demand)
+    start = trace[0][0]
+    if args.simulate:
+        run = simulated_run(
+            asyncio.run(simulate(trace, prices)), start, args.interval, count
+        )
+    else:
+        run = recorded_run(stats, args.interval, count)
+
+    rows = [
+        (
+            start + datetime.timedelta(seconds=index * args.interval),
+            demand[index],
+            oracle.interval_cost[index],
+            run.interval_cost[index],
+            run.interval_cost[index] - oracle.interval_cost[index],
+            run.interval_offline[index],
+        )
+        for index in range(count)
+    ]
+
+    print(f"{'start':>19} {'requests':>9} {'oracle':>9} {'run':>9} {'regret':>9} {'offline':>8}")
+    for timestamp, requests, oracle_cost, run_cost, regret, offline in rows:
+        print(
+            f"{timestamp:%Y-%m-%d %H:%M:%S} {requests:9.0f} {oracle_cost:9.2f} "
+            f"{run_cost:9.2f} {regret:9.2f} {offline:8.2f}"
+        )
+
+    run_cost = sum(run.interval_cost)
+    print(f"Oracle status: {oracle.status}")
+    print(f"Oracle cost at zero offline minutes: {oracle.cost:.2f}")
+    print(
+        f"Run cost: {run_cost:.2f}, offline minutes: {sum(run.interval_offline):.2f}, "
+        f"regret: {run_cost - oracle.cost:.2f}"
+    )
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ("start", "requests", "oracle_cost", "run_cost", "regret", "offline")
+            )
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import bisect
+import dataclasses
+import datetime
+import itertools
+import json
+import logging
+import pickle
+import typing as tp
+
+from pydantic import TypeAdapter
+
+from src import models
+
+from src.services.cadence import CadencePolicy
+from src.services.fleet import FleetState
+from src.services.latency import LatencyService
+from src.services.mutation import MutationExecutor
+from src.services.predict import PredictService
+from src.services.resource import ResourceService
+from src.services.scheduler import SchedulerService
+from src.services.stats import StatsService
+from src.settings import settings
+from src.workers import WorkerPool
+
+
+logger = logging.getLogger(__name__)
+
+Trace = tp.List[tp.Tuple[datetime.datetime, float]]
+
+DEMAND: tp.Dict[models.ResourceType, tp.Tuple[float, float, float, float]] = {
+    models.ResourceType.VM: (0.001, 0.005, 0.05, 0.3),
+    models.ResourceType.DB: (0.001, 0.03, 0.05, 0.512),
+}
+MAX_LOAD = 95
+
+
+def load_stats(path: str) -> tp.List[models.Stat]:
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+
+    if isinstance(data, dict) and "stats" in data:
+        data = data["stats"]["memory"]
+    if isinstance(data, dict):
+        data = list(data.values())
+    return sorted(data, key=lambda x: x.timestamp)
+
+
+def load_trace(path: str) -> Trace:
+    return [(stat.timestamp, float(stat.requests)) for stat in load_stats(path)]
+
+
+def load_prices(path: str) -> tp.List[models.Price]:
+    with open(path) as f:
+        return TypeAdapter(tp.List[models.Price]).validate_python(json.load(f))
+
+
+@dataclasses.dataclass
+class SimulatedPod:
+    id: int
+    type: models.ResourceType
+    cpu: int
+    ram: int
+    cost: int
+    created_at: datetime.datetime
+    failed_until: datetime.datetime
+
+
+@dataclasses.dataclass
+class Interval:
+    start: datetime.datetime
+    end: datetime.datetime
+    cost: float
+    offline_second: float
+
+
+@dataclasses.dataclass
+class SimulationResult:
+    cost: float
+    offline_minute: float
+    intervals: tp.List[Interval]
+
+
+class SimulatedCloud:
+    def __init__(
+        self,
+        trace: Trace,
+        prices: tp.List[models.Price],
+        step_second: float = 5,
+    ) -> None:
+        self.trace: Trace = trace
+        self.prices: tp.List[models.Price] = prices
+        self.step_second: float = step_second
+        self._times: tp.List[datetime.datetime] = [item[0] for item in trace]
+
+        self.now: datetime.datetime = trace[0][0]
+        self.pods: tp.Dict[int, SimulatedPod] = {}
+        self._ids = itertools.count(1)
+
+        self.cost_total: float = 0.0
+        self.offline_second: float = 0.0
+        self.requests_total: float = 0.0
+        self.intervals: tp.List[Interval] = []
+
+    @property
+    def end(self) -> datetime.datetime:
+        return self.trace[-1][0]
+
+    def requests(self, at: tp.Optional[datetime.datetime] = None) -> float:
+        index = bisect.bisect_right(self._times, at or self.now) - 1
+        return self.trace[max(index, 0)][1]
+
+    def usage(
+        self, resource_type: models.ResourceType
+    ) -> tp.Tuple[int, int, float, float]:
+        cpu, ram, count = 0, 0, 0
+        for pod in self.pods.values():
+            if pod.type == resource_type and pod.failed_until <= self.now:
+                cpu, ram, count = cpu + pod.cpu, ram + pod.ram, count + 1
+
+        request_cpu, request_ram, overhead_cpu, overhead_ram = DEMAND[resource_type]
+        requests = self.requests()
+        need_cpu = requests * request_cpu + count * overhead_cpu
+        need_ram = requests * request_ram + count * overhead_ram
+        cpu_load = need_cpu / cpu * 100 if cpu else 100.0
+        ram_load = need_ram / ram * 100 if ram else 100.0
+        return cpu, ram, cpu_load, ram_load
+
+    def is_offline(self) -> bool:
+        for resource_type in DEMAND:
+            _, _, cpu_load, ram_load = self.usage(resource_type)
+            if cpu_load >= MAX_LOAD or ram_load >= MAX_LOAD:
+                return True
+        return False
+
+    def advance(self, second: float) -> None:
+        start, cost, offline = self.now, 0.0, 0.0
+        while second > 0:
+            step = min(self.step_second, second)
+            rate = sum(pod.cost for pod in self.pods.values())
+            cost += rate * step / 60
+            if self.is_offline():
+                offline += step
+            self.requests_total += self.requests() * step
+            self.now += datetime.timedelta(seconds=step)
+            second -= step
+
+        self.cost_total += cost
+        self.offline_second += offline
+        self.intervals.append(Interval(start, self.now, cost, offline))
+
+    def create(self, pod: models.PostResource) -> SimulatedPod:
+        price = self.price(pod)
+        item = SimulatedPod(
+            id=next(self._ids),
+            type=pod.type,
+            cpu=pod.cpu,
+            ram=pod.ram,
+            cost=price.cost,
+            created_at=self.now,
+            failed_until=self.now + datetime.timedelta(seconds=settings.boot_second),
+        )
+        self.pods[item.id] = item
+        return item
+
+    def update(self, item_id: int, pod: models.PostResource) -> None:
+        item = self.pods[item_id]
+        item.cpu, item.ram, item.cost = pod.cpu, pod.ram, self.price(pod).cost
+        item.failed_until = self.now + datetime.timedelta(
+            seconds=settings.resize_second
+        )
+
+    def delete(self, item_id: int) -> None:
+        self.pods.pop(item_id)
+
+    def price(self, pod: models.PostResource) -> models.Price:
+        for price in self.prices:
+            if (price.type, price.cpu, price.ram) == (pod.type, pod.cpu, pod.ram):
+                return price
+        raise ValueError(f"No price for {pod}")
+
+
+class SimulatedPriceClient:
+    def __init__(self, prices: tp.List[models.Price]) -> None:
+        self._prices: tp.List[models.Price] = prices
+        self.prices: tp.Optional[tp.Dict[models.ResourceType, tp.List[models.Price]]] = (
+            None
+        )
+
+    async def get(self) -> tp.List[models.Price]:
+        return list(self._prices)
+
+    async def get_grouped_prices(
+        self,
+    ) -> tp.Dict[models.ResourceType, tp.List[models.Price]]:
+        result = {}
+        for item in self._prices:
+            result.setdefault(item.type, []).append(item)
+        self.prices = result
+        return result
+
+
+class SimulatedResourceClient:
+    def __init__(self, cloud: SimulatedCloud) -> None:
+        self._cloud: SimulatedCloud = cloud
+
+    async def get(self) -> tp.List[models.GetResource]:
+        # The API reports per-pod load weighted so that sum(load * cpu) over a
+        # type is the type's utilization, which is what FleetSnapshot.load reads.
+        usage = {item: self._cloud.usage(item) for item in DEMAND}
+        result = []
+        for pod in self._cloud.pods.values():
+            failed = pod.failed_until > self._cloud.now
+            cpu, ram, cpu_load, ram_load = usage[pod.type]
+            cpu_load, ram_load = cpu_load / max(cpu, 1), ram_load / max(ram, 1)
+            result.append(
+                models.GetResource(
+                    id=pod.id,
+                    cost=pod.cost,
+                    cpu=pod.cpu,
+                    cpu_load=0 if failed else cpu_load,
+                    failed=failed,
+                    failed_until=pod.failed_until,
+                    ram=pod.ram,
+                    ram_load=0 if failed else ram_load,
+                    type=pod.type,
+                )
+            )
+        return result
+
+    async def post(self, pod: models.PostResource) -> None:
+        self._cloud.create(pod)
+
+    async def put(self, item_id: int, pod: models.PostResource) -> None:
+        self._cloud.update(item_id, pod)
+
+    async def delete(self, item_id: int) -> None:
+        self._cloud.delete(item_id)
+
+
+class SimulatedStatsClient:
+    def __init__(self, cloud: SimulatedCloud) -> None:
+        self._cloud: SimulatedCloud = cloud
+
+    async def get(self) -> models.Stat:
+        cloud = self._cloud
+        vm_cpu, vm_ram, vm_cpu_load, vm_ram_load = cloud.usage(models.ResourceType.VM)
+        db_cpu, db_ram, db_cpu_load, db_ram_load = cloud.usage(models.ResourceType.DB)
+        elapsed = max((cloud.now - cloud.trace[0][0]).total_seconds(), 1)
+        last1 = sum(pod.cost for pod in cloud.pods.values())
+        return models.Stat(
+            availability=1 - cloud.offline_second / elapsed,
+            cost_total=cloud.cost_total,
+            db_cpu=db_cpu,
+            db_cpu_load=db_cpu_load,
+            db_ram=db_ram,
+            db_ram_load=db_ram_load,
+            last1=last1,
+            last5=last1 * 5,
+            last15=last1 * 15,
+            lastDay=cloud.cost_total,
+            lastHour=cloud.cost_total,
+            lastWeek=cloud.cost_total,
+            offline_time=cloud.offline_second / 60,
+            online=not cloud.is_offline(),
+            online_time=(elapsed - cloud.offline_second) / 60,
+            requests=cloud.requests(),
+            requests_total=cloud.requests_total,
+            response_time=100 + 2 * max(vm_cpu_load, db_cpu_load),
+            vm_cpu=vm_cpu,
+            vm_cpu_load=vm_cpu_load,
+            vm_ram=vm_ram,
+            vm_ram_load=vm_ram_load,
+            timestamp=cloud.now,
+        )
+
+
+async def simulate(
+    trace: Trace,
+    prices: tp.List[models.Price],
+    until: tp.Optional[datetime.datetime] = None,
+) -> SimulationResult:
+    cloud = SimulatedCloud(trace, prices)
+    price_client = SimulatedPriceClient(prices)
+    stats_service = StatsService(SimulatedStatsClient(cloud))
+    predict_service = PredictService(stats_service)
+    resource_service = ResourceService(
+        price_client, SimulatedResourceClient(cloud)
+    )
+    fleet_state = FleetState(clock=lambda: cloud.now)
+    workers = WorkerPool(1)
+    scheduler_service = SchedulerService(
+        price_client=price_client,
+        resource_service=resource_service,
+        stat_service=stats_service,
+        predict_service=predict_service,
+        mutation_executor=MutationExecutor(resource_service),
+        fleet_state=fleet_state,
+        latency_service=LatencyService(stats_service),
+        workers=workers,
+    )
+    cadence_policy = CadencePolicy(stats_service, scheduler_service, fleet_state)
+
+    end = min(until or cloud.end, cloud.end)
+    try:
+        while cloud.now < end:
+            try:
+                await scheduler_service.task()
+            except Exception as exc:
+                logger.error(f"Simulated task failed: {exc}")
+            remaining = (end - cloud.now).total_seconds()
+            cloud.advance(min(cadence_policy.interval(), remaining))
+    finally:
+        workers.shutdown()
+
+    return SimulationResult(
+        cost=cloud.cost_total,
+        offline_minute=cloud.offline_second / 60,
+        intervals=cloud.intervals,
+    )
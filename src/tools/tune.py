@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import concurrent.futures
+import dataclasses
+import json
+import logging
+import math
+import os
+import random
+import sys
+import typing as tp
+import warnings
+
+from src import models
+from src.settings import settings
+from src.tools.simulator import Trace, load_prices, load_trace, simulate
+
+
+logger = logging.getLogger(__name__)
+
+SPACE: tp.Dict[str, tp.Tuple[str, float, float]] = {
+    "delta": ("float", 0.05, 0.5),
+    "gap": ("int", 2, 10),
+    "pod_load_max": ("int", 70, 94),
+    "penalty": ("log", 1e-4, 1e-1),
+    "train_size": ("int", 30, 300),
+    "min_memory_size": ("int", 5, 40),
+    "sleep_second": ("int", 5, 60),
+}
+FIXED: tp.Dict[str, tp.Any] = {
+    "adaptive_sleep": False,
+    "prod": True,
+    "checkpoint": False,
+    "plot": False,
+    "warm_up": False,
+}
+
+
+@dataclasses.dataclass
+class Trial:
+    params: tp.Dict[str, tp.Any]
+    budget: float
+    cost: float
+    offline_minute: float
+
+    @property
+    def objective(self) -> float:
+        return self.cost + settings.offline_minute_cost * self.offline_minute
+
+
+def sample(rng: random.Random) -> tp.Dict[str, tp.Any]:
+    params = {}
+    for name, (kind, low, high) in SPACE.items():
+        if kind == "int":
+            params[name] = rng.randint(int(low), int(high))
+        elif kind == "log":
+            params[name] = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            params[name] = rng.uniform(low, high)
+    params["min_memory_size"] = min(params["min_memory_size"], params["train_size"])
+    return params
+
+
+def evaluate(
+    trace: Trace,
+    prices: tp.List[models.Price],
+    params: tp.Dict[str, tp.Any],
+    budget: float,
+    fixed: tp.Dict[str, tp.Any],
+) -> Trial:
+    until = trace[0][0] + (trace[-1][0] - trace[0][0]) * budget
+    with settings.override(**{**fixed, **params}):
+        result = asyncio.run(simulate(trace, prices, until))
+    return Trial(params, budget, result.cost, result.offline_minute)
+
+
+def run_trials(
+    pool: concurrent.futures.Executor,
+    trace: Trace,
+    prices: tp.List[models.Price],
+    candidates: tp.List[tp.Dict[str, tp.Any]],
+    budget: float,
+    fixed: tp.Dict[str, tp.Any],
+) -> tp.List[Trial]:
+    futures = [
+        pool.submit(evaluate, trace, prices, params, budget, fixed)
+        for params in candidates
+    ]
+    result = []
+    for future in futures:
+        trial = future.result()
+        logger.info(
+            f"Trial: budget = {trial.budget:.2f}, cost = {trial.cost:.1f}, "
+            f"offline = {trial.offline_minute:.1f}, params = {trial.params}"
+        )
+        result.append(trial)
+    return result
+
+
+def random_search(
+    pool: concurrent.futures.Executor,
+    trace: Trace,
+    prices: tp.List[models.Price],
+    rng: random.Random,
+    trials: int,
+    fixed: tp.Dict[str, tp.Any],
+) -> tp.List[Trial]:
+    candidates = [sample(rng) for _ in range(trials)]
+    return run_trials(pool, trace, prices, candidates, 1.0, fixed)
+
+
+def successive_halving(
+    pool: concurrent.futures.Executor,
+    trace: Trace,
+    prices: tp.List[models.Price],
+    rng: random.Random,
+    trials: int,
+    fixed: tp.Dict[str, tp.Any],
+    eta: int = 3,
+) -> tp.List[Trial]:
+    candidates = [sample(rng) for _ in range(trials)]
+    rounds, count = 0, trials
+    while count >= eta:
+        count //= eta
+        rounds += 1
+    budget = eta ** -rounds
+
+    history = []
+    while True:
+        result = run_trials(pool, trace, prices, candidates, budget, fixed)
+        history.extend(result)
+        if budget >= 1 or len(candidates) <= 1:
+            return history
+        result.sort(key=lambda x: x.objective)
+        candidates = [item.params for item in result[: max(len(result) // eta, 1)]]
+        budget = min(budget * eta, 1.0)
+
+
+def pareto_front(trials: tp.List[Trial]) -> tp.List[Trial]:
+    front = []
+    for trial in sorted(trials, key=lambda x: (x.cost, x.offline_minute)):
+        if not front or trial.offline_minute < front[-1].offline_minute:
+            front.append(trial)
+    return front
+
+
+def write_env(path: str, params: tp.Dict[str, tp.Any]) -> None:
+    with open(path, "w") as f:
+        for name, value in params.items():
+            if isinstance(value, float):
+                value = round(value, 6)
+            if not isinstance(value, str):
+                value = json.dumps(value)
+            f.write(f"{name.upper()}={value}\n")
+
+
+def parse_overrides(items: tp.List[str]) -> tp.Dict[str, tp.Any]:
+    result = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        try:
+            result[name] = json.loads(value)
+        except ValueError:
+            result[name] = value
+    return result
+
+
+def main(argv: tp.Optional[tp.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Tune scheduler settings on a trace")
+    parser.add_argument("trace", help="memory or checkpoint pickle with stats")
+    parser.add_argument("--prices", required=True, help="JSON price catalog")
+    parser.add_argument("--method", choices=("random", "halving"), default="halving")
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--env", default="tuned.env")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    logging.getLogger("src.services").setLevel(logging.WARNING)
+
+    trace = load_trace(args.trace)
+    prices = load_prices(args.prices)
+    fixed = {**FIXED, **parse_overrides(args.set)}
+    rng = random.Random(args.seed)
+
+    with concurrent.futures.ProcessPoolExecutor(args.workers) as pool:
+        if args.method == "random":
+            trials = random_search(pool, trace, prices, rng, args.trials, fixed)
+        else:
+            trials = successive_halving(
+                pool, trace, prices, rng, args.trials, fixed, args.eta
+            )
+
+    budget = max(trial.budget for trial in trials)
+    front = pareto_front([trial for trial in trials if trial.budget >= budget])
+    print(f"{'cost':>12} {'offline':>9}  params")
+    for trial in front:
+        print(f"{trial.cost:12.1f} {trial.offline_minute:9.1f}  {trial.params}")
+
+    best = min(front, key=lambda x: x.objective)
+    write_env(args.env, {**fixed, **best.params})
+    print(f"Chosen: {best.params}. Written to {args.env}")
+
+
+if __name__ == "__main__":
+    main()
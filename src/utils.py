@@ -4,18 +4,6 @@ from functools import wraps
 
 from pydantic import TypeAdapter
 
-from pulp import (
-    PULP_CBC_CMD,
-    LpProblem,
-    LpBinary,
-    LpMinimize,
-    LpVariable,
-    LpInteger,
-    lpSum,
-    LpStatus,
-    value,
-)
-
 from src import models
 from src.settings import settings
 
@@ -41,6 +29,9 @@ def choose_resource(
     cpu_overhead: float = 0,
     ram_overhead: float = 0,
 ):
+    from pulp import PULP_CBC_CMD, LpProblem, LpMinimize, LpVariable, LpInteger
+    from pulp import lpSum, value
+
     resource_types_cnt = len(data)
     prob = LpProblem("Minimize_Cost", LpMinimize)
 
@@ -70,6 +61,9 @@ def choose_resource_exists(
     cpu_overhead: float = 0,
     ram_overhead: float = 0,
 ):
+    from pulp import PULP_CBC_CMD, LpProblem, LpBinary, LpMinimize, LpVariable
+    from pulp import lpSum, LpStatus, value
+
     pods_cnt = len(pods)
     prob = LpProblem("Minimize_Active_VMs", LpMinimize)
 
@@ -99,7 +93,13 @@ def choose_optimal_resources(
     request_ram: float,
     overhead_cpu: float,
     overhead_ram: float,
+    load_cap: tp.Optional[float] = None,
 ):
+    from pulp import PULP_CBC_CMD, LpProblem, LpMinimize, LpVariable, lpSum, value
+
+    if load_cap is None:
+        load_cap = settings.pod_load_max_percent
+
     resource_types_cnt = len(data)
     model = LpProblem("Minimize_Cost", LpMinimize)
     vm_vars = LpVariable.dicts(
@@ -112,14 +112,14 @@ def choose_optimal_resources(
     )
     model += (
         lpSum(
-            vm_vars[i] * (settings.pod_load_max_percent * data[i].cpu - overhead_cpu)
+            vm_vars[i] * (load_cap * data[i].cpu - overhead_cpu)
             for i in range(resource_types_cnt)
         )
         >= requests * request_cpu
     )
     model += (
         lpSum(
-            vm_vars[i] * (settings.pod_load_max_percent * data[i].ram - overhead_ram)
+            vm_vars[i] * (load_cap * data[i].ram - overhead_ram)
             for i in range(resource_types_cnt)
         )
         >= requests * request_ram
@@ -0,0 +1,26 @@
+import asyncio
+import contextvars
+import functools
+import typing as tp
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+T = tp.TypeVar("T")
+
+
+class WorkerPool:
+    def __init__(self, max_workers: int) -> None:
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="worker"
+        )
+
+    async def run(self, function: tp.Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, function, *args, **kwargs)
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
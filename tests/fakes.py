@@ -0,0 +1,112 @@
+import dataclasses
+import datetime
+import typing as tp
+
+from src import models
+from src.services.fleet import FleetState
+from src.services.latency import LatencyService
+from src.services.mutation import MutationExecutor
+from src.services.predict import PredictService
+from src.services.resource import ResourceService
+from src.services.scheduler import SchedulerService
+from src.services.stats import StatsService
+from src.tools.simulator import (
+    SimulatedCloud,
+    SimulatedPriceClient,
+    SimulatedResourceClient,
+    SimulatedStatsClient,
+)
+from src.workers import WorkerPool
+
+
+START = datetime.datetime(2024, 1, 1)
+
+PRICES = [
+    models.Price(id=1, cost=10, cpu=1, ram=2, name="s", type=models.ResourceType.VM),
+    models.Price(id=2, cost=18, cpu=2, ram=4, name="m", type=models.ResourceType.VM),
+    models.Price(id=3, cost=35, cpu=4, ram=8, name="l", type=models.ResourceType.VM),
+    models.Price(id=4, cost=12, cpu=1, ram=4, name="s", type=models.ResourceType.DB),
+    models.Price(id=5, cost=22, cpu=2, ram=8, name="m", type=models.ResourceType.DB),
+    models.Price(id=6, cost=40, cpu=4, ram=16, name="l", type=models.ResourceType.DB),
+]
+
+
+def make_cloud(
+    requests: tp.Sequence[float], step_second: float = 15
+) -> SimulatedCloud:
+    trace = [
+        (START + datetime.timedelta(seconds=index * step_second), float(value))
+        for index, value in enumerate(requests)
+    ]
+    return SimulatedCloud(trace, PRICES)
+
+
+def add_pods(
+    cloud: SimulatedCloud,
+    resource_type: models.ResourceType,
+    name: str,
+    count: int,
+    ready: bool = True,
+) -> tp.List[int]:
+    price = next(
+        item for item in PRICES if item.type == resource_type and item.name == name
+    )
+    ids = []
+    for _ in range(count):
+        pod = cloud.create(
+            models.PostResource(cpu=price.cpu, ram=price.ram, type=resource_type)
+        )
+        if ready:
+            pod.failed_until = cloud.now
+        ids.append(pod.id)
+    return ids
+
+
+@dataclasses.dataclass
+class Services:
+    cloud: SimulatedCloud
+    price_client: SimulatedPriceClient
+    stats_client: SimulatedStatsClient
+    stats_service: StatsService
+    predict_service: PredictService
+    resource_service: ResourceService
+    fleet_state: FleetState
+    latency_service: LatencyService
+    mutation_executor: MutationExecutor
+    scheduler_service: SchedulerService
+    workers: WorkerPool
+
+
+def make_services(cloud: SimulatedCloud) -> Services:
+    price_client = SimulatedPriceClient(cloud.prices)
+    stats_client = SimulatedStatsClient(cloud)
+    stats_service = StatsService(stats_client)
+    predict_service = PredictService(stats_service)
+    resource_service = ResourceService(price_client, SimulatedResourceClient(cloud))
+    fleet_state = FleetState(clock=lambda: cloud.now)
+    latency_service = LatencyService(stats_service)
+    mutation_executor = MutationExecutor(resource_service)
+    workers = WorkerPool(2)
+    scheduler_service = SchedulerService(
+        price_client=price_client,
+        resource_service=resource_service,
+        stat_service=stats_service,
+        predict_service=predict_service,
+        mutation_executor=mutation_executor,
+        fleet_state=fleet_state,
+        latency_service=latency_service,
+        workers=workers,
+    )
+    return Services(
+        cloud=cloud,
+        price_client=price_client,
+        stats_client=stats_client,
+        stats_service=stats_service,
+        predict_service=predict_service,
+        resource_service=resource_service,
+        fleet_state=fleet_state,
+        latency_service=latency_service,
+        mutation_executor=mutation_executor,
+        scheduler_service=scheduler_service,
+        workers=workers,
+    )
@@ -0,0 +1,151 @@
+import asyncio
+import datetime
+
+import pytest
+
+from src import models
+from src.services.consolidation import ConsolidationService
+from src.settings import settings
+from tests.fakes import add_pods, make_cloud, make_services
+
+
+DB = models.ResourceType.DB
+
+
+@pytest.fixture
+def services():
+    cloud = make_cloud([200] * 200)
+    add_pods(cloud, DB, "l", 4)
+    add_pods(cloud, models.ResourceType.VM, "m", 1)
+    services = make_services(cloud)
+    yield services
+    services.workers.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    with settings.override(
+        min_memory_size=1, consolidation_ticks=1, consolidation_volatility=1.0
+    ):
+        yield
+
+
+def make_consolidation(services):
+    return ConsolidationService(
+        price_client=services.price_client,
+        resource_service=services.resource_service,
+        stats_service=services.stats_service,
+        predict_service=services.predict_service,
+        scheduler_service=services.scheduler_service,
+        mutation_executor=services.mutation_executor,
+        fleet_state=services.fleet_state,
+        workers=services.workers,
+    )
+
+
+async def refresh(services):
+    await services.price_client.get_grouped_prices()
+    resources = await services.resource_service.get()
+    services.fleet_state.reconcile(resources)
+    await services.stats_service.update_stats(resources)
+
+
+def shapes(cloud, resource_type=DB):
+    return sorted(
+        (pod.cpu, pod.ram) for pod in cloud.pods.values() if pod.type == resource_type
+    )
+
+
+def test_creates_target_before_deleting(services):
+    cloud, consolidation = services.cloud, make_consolidation(services)
+
+    async def main():
+        await refresh(services)
+        await consolidation.check()
+        assert shapes(cloud) == [(2, 8)] + [(4, 16)] * 4
+        assert DB in consolidation.migrations
+
+        for _ in range(4):
+            cloud.advance(60)
+            await refresh(services)
+            await consolidation.check()
+            assert shapes(cloud) == [(2, 8)] + [(4, 16)] * 4
+            assert not cloud.is_offline()
+
+        cloud.advance(settings.boot_second)
+        await refresh(services)
+        await consolidation.check()
+
+    asyncio.run(main())
+
+    assert shapes(cloud) == [(2, 8)]
+    assert DB not in consolidation.migrations
+    assert not cloud.is_offline()
+
+
+def test_keeps_old_pods_when_target_cannot_serve_demand(services):
+    cloud, consolidation = services.cloud, make_consolidation(services)
+
+    async def main():
+        await refresh(services)
+        await consolidation.check()
+        assert DB in consolidation.migrations
+
+        cloud.trace[:] = [(timestamp, 1000.0) for timestamp, _ in cloud.trace]
+        cloud.advance(settings.boot_second + 60)
+        await refresh(services)
+        await consolidation.check()
+
+    asyncio.run(main())
+
+    assert shapes(cloud) == [(2, 8)] + [(4, 16)] * 4
+    assert DB not in consolidation.migrations
+
+
+def test_skips_busy_or_unstable_fleet(services):
+    cloud, consolidation = services.cloud, make_consolidation(services)
+
+    async def main():
+        await refresh(services)
+        with settings.override(consolidation_load=5):
+            await consolidation.check()
+        with settings.override(consolidation_volatility=-1.0):
+            await consolidation.check()
+
+    asyncio.run(main())
+
+    assert shapes(cloud) == [(4, 16)] * 4
+    assert not consolidation.migrations
+
+
+def test_does_not_start_while_operations_are_in_flight(services):
+    cloud, consolidation = services.cloud, make_consolidation(services)
+    add_pods(cloud, DB, "s", 1, ready=False)
+
+    async def main():
+        await refresh(services)
+        await consolidation.check()
+
+    asyncio.run(main())
+
+    assert shapes(cloud) == [(1, 4)] + [(4, 16)] * 4
+    assert DB not in consolidation.migrations
+
+
+def test_abandons_migration_when_creates_time_out(services):
+    cloud, consolidation = services.cloud, make_consolidation(services)
+
+    async def main():
+        await refresh(services)
+        await consolidation.check()
+        for pod in cloud.pods.values():
+            if (pod.cpu, pod.ram) == (2, 8):
+                pod.failed_until = cloud.now + datetime.timedelta(days=1)
+        cloud.advance(2 * settings.boot_second + 60)
+        await refresh(services)
+        await consolidation.check()
+
+    asyncio.run(main())
+
+    assert shapes(cloud) == [(2, 8)] + [(4, 16)] * 4
+    assert DB not in consolidation.migrations
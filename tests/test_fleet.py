@@ -0,0 +1,84 @@
+import datetime
+
+import pytest
+
+from src import models
+from src.services.fleet import FleetState
+from src.services.mutation import Mutation, MutationReport
+from src.services.scheduler import Plan
+from src.settings import settings
+from tests.fakes import PRICES, START, make_cloud, make_services
+
+
+VM = models.ResourceType.VM
+
+
+def pod(pod_id, cpu=2, ram=4, failed=False):
+    return models.GetResource(
+        id=pod_id,
+        cost=18,
+        cpu=cpu,
+        cpu_load=0,
+        failed=failed,
+        failed_until=START,
+        ram=ram,
+        ram_load=0,
+        type=VM,
+    )
+
+
+def test_reconcile_binds_create_and_completes_when_ready():
+    now = [START]
+    fleet = FleetState(clock=lambda: now[0])
+    fleet.reconcile([pod(1)])
+    fleet.record(MutationReport(succeeded=[Mutation.create(VM, PRICES[1])]))
+    boot = START + datetime.timedelta(seconds=settings.boot_second)
+
+    assert fleet.effective_capacity(VM, START) == (2, 4, 1)
+    assert fleet.effective_capacity(VM, boot) == (4, 8, 2)
+
+    fleet.reconcile([pod(1), pod(2, failed=True)])
+    assert fleet.in_flight_ids(VM) == {2}
+    assert not fleet.genuine_failures(VM)
+    assert fleet.effective_capacity(VM, boot) == (4, 8, 2)
+
+    now[0] = boot
+    fleet.reconcile([pod(1), pod(2)])
+    assert not fleet.in_flight(VM)
+
+
+@pytest.fixture
+def services():
+    services = make_services(make_cloud([100]))
+    services.workers.shutdown()
+    services.fleet_state.reconcile([pod(1), pod(2)])
+    services.fleet_state.record(
+        MutationReport(succeeded=[Mutation.create(VM, PRICES[1])])
+    )
+    return services
+
+
+def test_skip_in_flight_drops_creates_covered_by_in_flight_capacity(services):
+    plan = Plan([PRICES[1]], [], [], need_cpu=6, need_ram=12)
+
+    result = services.scheduler_service._skip_in_flight(VM, plan, 0, 0)
+
+    assert result.to_create == []
+
+
+@pytest.mark.parametrize(
+    "to_update, to_delete",
+    [
+        ([], [1]),
+        ([(2, models.PostResource(cpu=1, ram=2, type=VM))], []),
+    ],
+)
+def test_skip_in_flight_keeps_creates_when_plan_removes_capacity(
+    services, to_update, to_delete
+):
+    plan = Plan([PRICES[1]], to_update, to_delete, need_cpu=6, need_ram=12)
+
+    result = services.scheduler_service._skip_in_flight(VM, plan, 0, 0)
+
+    assert result.to_create == [PRICES[1]]
+    assert result.to_update == to_update and result.to_delete == to_delete
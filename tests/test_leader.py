@@ -0,0 +1,115 @@
+import datetime
+
+import httpx
+
+from src import models
+from src.clients.price import PriceClient
+from src.services.fleet import Operation
+from src.services.mutation import Mutation, MutationReport
+from src.settings import settings
+from src.tenant import Tenant
+from src.workers import WorkerPool
+from tests.fakes import PRICES
+
+
+def make_tenant(http_client, workers):
+    return Tenant(
+        token="token",
+        http_client=http_client,
+        price_client=PriceClient(http_client),
+        workers=workers,
+    )
+
+
+def test_promoted_follower_restores_in_flight_operations(tmp_path):
+    http_client, workers = httpx.AsyncClient(), WorkerPool(1)
+    overrides = dict(
+        ha=True,
+        lease_dir=str(tmp_path),
+        checkpoint=True,
+        checkpoint_path=str(tmp_path / "checkpoint.pickle"),
+    )
+    try:
+        with settings.override(**overrides):
+            leader, follower = (
+                make_tenant(http_client, workers),
+                make_tenant(http_client, workers),
+            )
+            leader.refresh_leadership()
+            follower.refresh_leadership()
+            assert leader.is_leader and not follower.is_leader
+
+            now = datetime.datetime.now()
+            leader.fleet_state.operations.append(
+                Operation(
+                    mutation=Mutation.create(models.ResourceType.VM, PRICES[0]),
+                    issued_at=now,
+                    ready_at=now + datetime.timedelta(seconds=settings.boot_second),
+                    pod_id=None,
+                )
+            )
+            leader.checkpoint_service.save()
+            leader.leader.release()
+
+            follower.refresh_leadership()
+            assert follower.is_leader
+            in_flight = follower.fleet_state.in_flight(models.ResourceType.VM)
+            assert [item.mutation.shape for item in in_flight] == [
+                (models.ResourceType.VM, 1, 2)
+            ]
+
+            follower.refresh_leadership()
+            assert len(follower.fleet_state.operations) == 1
+    finally:
+        workers.shutdown()
+
+
+def test_follower_keeps_state_without_promotion(tmp_path):
+    http_client, workers = httpx.AsyncClient(), WorkerPool(1)
+    overrides = dict(
+        ha=True,
+        lease_dir=str(tmp_path),
+        checkpoint=True,
+        checkpoint_path=str(tmp_path / "checkpoint.pickle"),
+    )
+    try:
+        with settings.override(**overrides):
+            leader, follower = (
+                make_tenant(http_client, workers),
+                make_tenant(http_client, workers),
+            )
+            leader.refresh_leadership()
+            leader.checkpoint_service.save()
+            follower.refresh_leadership()
+            assert not follower.is_leader
+            assert follower.fleet_state.operations == []
+    finally:
+        workers.shutdown()
+
+
+def test_checkpoint_is_saved_after_fleet_mutations(tmp_path):
+    http_client, workers = httpx.AsyncClient(), WorkerPool(1)
+    overrides = dict(
+        checkpoint=True,
+        checkpoint_second=3600,
+        checkpoint_path=str(tmp_path / "checkpoint.pickle"),
+    )
+    try:
+        with settings.override(**overrides):
+            tenant = make_tenant(http_client, workers)
+            service = tenant.checkpoint_service
+            service.save()
+            saved_at = service._saved_at
+
+            service.maybe_save()
+            assert service._saved_at == saved_at
+
+            tenant.fleet_state.record(
+                MutationReport(
+                    succeeded=[Mutation.create(models.ResourceType.VM, PRICES[0])]
+                )
+            )
+            service.maybe_save()
+            assert service._saved_at > saved_at
+    finally:
+        workers.shutdown()
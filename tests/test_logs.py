@@ -0,0 +1,56 @@
+import logging
+import logging.handlers
+import queue
+
+from src.logs import LogListener, RateLimitFilter
+
+
+def make_record(msg, name="src.services.scheduler", level=logging.INFO, lineno=1):
+    return logging.LogRecord(name, level, __file__, lineno, msg, (), None)
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_rate_limit_keeps_exempt_and_warning_records():
+    limiter = RateLimitFilter(
+        rate=0.001, burst=1, sample={"#decision": 0.0}, exempt=["#decision"]
+    )
+
+    passed = [limiter.filter(make_record("#decision: type = [vm]")) for _ in range(5)]
+    limited = [limiter.filter(make_record("#forecast: mae")) for _ in range(5)]
+    warnings = [
+        limiter.filter(make_record("#forecast: mae", level=logging.WARNING))
+        for _ in range(5)
+    ]
+
+    assert all(passed)
+    assert limited == [True, False, False, False, False]
+    assert all(warnings)
+    assert limiter.flush() == {"#forecast": 4}
+
+
+def test_listener_reports_suppressed_counts_on_stop():
+    limiter = RateLimitFilter(rate=0.001, burst=1, sample={})
+    records, handler = queue.SimpleQueue(), CollectingHandler()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(limiter)
+    listener = LogListener(records, handler, limiter)
+    listener.start()
+
+    for _ in range(3):
+        queue_handler.handle(make_record("#forecast: mae"))
+    listener.stop()
+    listener.stop()
+
+    assert [record.getMessage() for record in handler.records] == [
+        "#forecast: mae",
+        "#suppressed: kind = [#forecast], count = [2]",
+    ]
+    assert handler.records[-1].suppressed == 2
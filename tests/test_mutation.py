@@ -0,0 +1,170 @@
+import asyncio
+import collections
+
+import pytest
+
+from src import models
+from src.exceptions import TransientError
+from src.services.mutation import Mutation, MutationExecutor, MutationKind
+from src.services.resource import ResourceService
+from src.settings import settings
+from src.tools.simulator import SimulatedPriceClient, SimulatedResourceClient
+from tests.fakes import PRICES, add_pods, make_cloud
+
+
+VM = models.ResourceType.VM
+
+
+class FlakyResourceClient(SimulatedResourceClient):
+    def __init__(self, cloud):
+        super().__init__(cloud)
+        self.failures = collections.defaultdict(list)
+        self.calls = collections.Counter()
+
+    async def _call(self, name, apply):
+        self.calls[name] += 1
+        failure = self.failures[name].pop(0) if self.failures[name] else None
+        if failure == "after":
+            await apply()
+            raise TransientError(f"{name} timed out")
+        if failure == "slow":
+            await apply()
+            await asyncio.sleep(0.2)
+            return None
+        if failure is not None:
+            raise failure
+        await apply()
+
+    async def post(self, pod):
+        await self._call("post", lambda: super(FlakyResourceClient, self).post(pod))
+
+    async def put(self, item_id, pod):
+        await self._call(
+            "put", lambda: super(FlakyResourceClient, self).put(item_id, pod)
+        )
+
+    async def delete(self, item_id):
+        await self._call(
+            "delete", lambda: super(FlakyResourceClient, self).delete(item_id)
+        )
+
+
+@pytest.fixture(autouse=True)
+def overrides():
+    with settings.override(mutation_backoff_second=0, mutation_retries=2):
+        yield
+
+
+def make_executor(cloud):
+    client = FlakyResourceClient(cloud)
+    service = ResourceService(SimulatedPriceClient(cloud.prices), client)
+    return MutationExecutor(service), client
+
+
+def execute(executor, mutations, known):
+    return asyncio.run(executor.execute(mutations, known))
+
+
+def known_pods(cloud):
+    return asyncio.run(SimulatedResourceClient(cloud).get())
+
+
+def test_retries_transient_failure():
+    cloud = make_cloud([100])
+    executor, client = make_executor(cloud)
+    client.failures["post"] = [TransientError("busy")]
+
+    report = execute(executor, [Mutation.create(VM, PRICES[0])], [])
+
+    assert report.ok and len(report.succeeded) == 1
+    assert client.calls["post"] == 2
+    assert len(cloud.pods) == 1
+
+
+def test_reconcile_detects_create_applied_despite_error():
+    cloud = make_cloud([100])
+    add_pods(cloud, VM, "s", 1)
+    executor, client = make_executor(cloud)
+    client.failures["post"] = ["after"]
+
+    report = execute(executor, [Mutation.create(VM, PRICES[0])], known_pods(cloud))
+
+    assert report.ok
+    assert client.calls["post"] == 1
+    assert len(cloud.pods) == 2
+
+
+def test_reconcile_counts_parallel_creates_of_same_shape():
+    cloud = make_cloud([100])
+    executor, client = make_executor(cloud)
+    client.failures["post"] = ["after", TransientError("busy")]
+
+    report = execute(
+        executor,
+        [Mutation.create(VM, PRICES[0]), Mutation.create(VM, PRICES[0])],
+        [],
+    )
+
+    assert report.ok
+    assert len(cloud.pods) == 2
+
+
+def test_reconcile_waits_for_slow_sibling_create():
+    cloud = make_cloud([100])
+    executor, client = make_executor(cloud)
+    client.failures["post"] = [TransientError("busy"), "slow"]
+
+    report = execute(
+        executor,
+        [Mutation.create(VM, PRICES[0]), Mutation.create(VM, PRICES[0])],
+        [],
+    )
+
+    assert report.ok and len(report.succeeded) == 2
+    assert client.calls["post"] == 3
+    assert len(cloud.pods) == 2
+
+
+def test_reconcile_detects_delete_applied_despite_error():
+    cloud = make_cloud([100])
+    (pod_id,) = add_pods(cloud, VM, "s", 1)
+    pods = known_pods(cloud)
+    executor, client = make_executor(cloud)
+    client.failures["delete"] = ["after"]
+
+    report = execute(executor, [Mutation.delete(pods[0])], pods)
+
+    assert report.ok
+    assert client.calls["delete"] == 1
+    assert pod_id not in cloud.pods
+
+
+def test_gives_up_after_retries():
+    cloud = make_cloud([100])
+    executor, client = make_executor(cloud)
+    client.failures["post"] = [TransientError("busy")] * 5
+
+    report = execute(executor, [Mutation.create(VM, PRICES[0])], [])
+
+    assert [item.kind for item, _ in report.failed] == [MutationKind.CREATE]
+    assert client.calls["post"] == settings.mutation_retries + 1
+    assert not cloud.pods
+
+
+def test_permanent_error_is_not_retried_and_skips_scale_downs():
+    cloud = make_cloud([100])
+    add_pods(cloud, VM, "m", 1)
+    pods = known_pods(cloud)
+    executor, client = make_executor(cloud)
+    client.failures["post"] = [RuntimeError("bad request")]
+
+    report = execute(
+        executor,
+        [Mutation.create(VM, PRICES[2]), Mutation.delete(pods[0])],
+        pods,
+    )
+
+    assert client.calls["post"] == 1
+    assert client.calls["delete"] == 0
+    assert [item.kind for item in report.skipped] == [MutationKind.DELETE]
+    assert len(cloud.pods) == 1
@@ -0,0 +1,47 @@
+import asyncio
+
+from src.services.predict import PredictService
+from src.services.stats import StatsService
+from src.settings import settings
+from src.tools.simulator import SimulatedStatsClient
+from tests.fakes import make_cloud
+
+
+def test_stalled_ticks_score_each_target_once():
+    cloud = make_cloud([100 + 5 * index for index in range(100)])
+    stats_service = StatsService(SimulatedStatsClient(cloud))
+
+    async def main():
+        for _ in range(settings.min_memory_size):
+            await stats_service.update_stats([])
+            cloud.advance(cloud.step_second)
+            predict_service.predict()
+        for _ in range(3):
+            predict_service.predict()
+        await stats_service.update_stats([])
+        predict_service.predict()
+
+    with settings.override(forecast_models=["naive", "holt"]):
+        predict_service = PredictService(stats_service)
+        asyncio.run(main())
+
+    assert [tick for tick, _ in predict_service._pending] == sorted(
+        {tick for tick, _ in predict_service._pending}
+    )
+    assert predict_service.mae["naive"][0].count == 1
+    assert predict_service.mae["holt"][0].count == 1
+
+
+def test_load_state_drops_scores_for_another_horizon():
+    stats_service = StatsService(SimulatedStatsClient(make_cloud([100])))
+    with settings.override(forecast_models=["naive"], forecast_horizon=3):
+        state = PredictService(stats_service).dump_state()
+        state["pending"].append((0, {"naive": [1.0, 2.0, 3.0]}))
+
+    with settings.override(forecast_models=["naive", "holt"], forecast_horizon=4):
+        predict_service = PredictService(stats_service)
+        predict_service.load_state(state)
+
+    assert len(predict_service.mae["naive"]) == 4
+    assert len(predict_service.mape["naive"]) == 4
+    assert not predict_service._pending
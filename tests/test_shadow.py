@@ -0,0 +1,84 @@
+import asyncio
+
+from src import models
+from src.services.mutation import MutationExecutor
+from src.services.shadow import RecordingExecutor, ShadowService
+from src.settings import settings
+from tests.fakes import add_pods, make_cloud, make_services
+
+
+def make_shadow(services):
+    return ShadowService(
+        price_client=services.price_client,
+        resource_service=services.resource_service,
+        stats_service=services.stats_service,
+        fleet_state=services.fleet_state,
+        latency_service=services.latency_service,
+        workers=services.workers,
+    )
+
+
+def test_shadow_sees_fleet_state_before_live_decision():
+    cloud = make_cloud([500] * 50)
+    services = make_services(cloud)
+    policies = {"cautious": {"pod_load_max": 60, "forecast_models": ["naive"]}}
+
+    async def main():
+        inputs = await services.scheduler_service.collect()
+        await shadow.capture()
+        await services.scheduler_service.decide(inputs)
+        await shadow.run(inputs)
+
+    try:
+        with settings.override(shadow_policies=policies, forecast_models=["holt"]):
+            shadow = make_shadow(services)
+            asyncio.run(main())
+    finally:
+        services.workers.shutdown()
+
+    (policy,) = shadow.policies
+    live_operations = services.fleet_state.operations
+    assert live_operations
+    assert policy.fleet_state.operations == []
+    assert len(cloud.pods) == len(live_operations)
+    assert [item.name for item in policy.predict_service.forecasters] == ["naive"]
+
+
+def test_shadow_forecast_uses_policy_overrides():
+    cloud = make_cloud([100 + 10 * index for index in range(50)])
+    add_pods(cloud, models.ResourceType.VM, "m", 1)
+    add_pods(cloud, models.ResourceType.DB, "l", 1)
+    with settings.override(forecast_models=["holt"]):
+        services = make_services(cloud)
+    policies = {"short": {"forecast_models": ["naive"], "forecast_horizon": 2}}
+
+    async def main():
+        for _ in range(settings.min_memory_size + 1):
+            await services.scheduler_service.collect()
+            await shadow.capture()
+            cloud.advance(cloud.step_second)
+
+    try:
+        with settings.override(shadow_policies=policies, forecast_models=["holt"]):
+            shadow = make_shadow(services)
+            asyncio.run(main())
+    finally:
+        services.workers.shutdown()
+
+    (policy,) = shadow.policies
+    assert policy.predict_service.selected == "naive"
+    assert len(policy.predict_service.requests) == 2
+    assert services.predict_service.selected == "holt"
+    assert len(services.predict_service.requests) == settings.forecast_horizon
+
+
+def test_recording_executor_initializes_base_class():
+    services = make_services(make_cloud([100]))
+    try:
+        executor = RecordingExecutor(services.resource_service, "policy")
+    finally:
+        services.workers.shutdown()
+
+    assert isinstance(executor, MutationExecutor)
+    assert executor.dry_run
+    assert executor._resource_service is services.resource_service
@@ -0,0 +1,58 @@
+import asyncio
+import math
+
+from src import models
+from src.services.stats import StatsService
+from src.tools.simulator import (
+    DEMAND,
+    SimulatedResourceClient,
+    SimulatedStatsClient,
+)
+from tests.fakes import add_pods, make_cloud
+
+
+def collect(cloud, stats_service, resource_client, samples):
+    for _ in range(samples):
+        resources = asyncio.run(resource_client.get())
+        asyncio.run(stats_service.update_stats(resources))
+        cloud.advance(cloud.step_second)
+
+
+def test_boot_window_samples_do_not_bias_coefficients():
+    requests = [800 + 400 * math.sin(index / 4) for index in range(200)]
+    cloud = make_cloud(requests, step_second=15)
+    stats_service = StatsService(SimulatedStatsClient(cloud))
+    resource_client = SimulatedResourceClient(cloud)
+
+    add_pods(cloud, models.ResourceType.VM, "m", 2, ready=False)
+    add_pods(cloud, models.ResourceType.DB, "l", 3, ready=False)
+    collect(cloud, stats_service, resource_client, 20)
+    add_pods(cloud, models.ResourceType.VM, "s", 1)
+    collect(cloud, stats_service, resource_client, 60)
+
+    for resource_type, prefix in (
+        (models.ResourceType.VM, "vm"),
+        (models.ResourceType.DB, "db"),
+    ):
+        cpu_request, ram_request, cpu_overhead, ram_overhead = DEMAND[resource_type]
+        assert math.isclose(
+            stats_service.get_request(resource_type)[0], cpu_request, rel_tol=0.05
+        ), prefix
+        assert math.isclose(
+            stats_service.get_request(resource_type)[1], ram_request, rel_tol=0.05
+        ), prefix
+        overhead = stats_service.get_overhead(resource_type)
+        assert math.isclose(overhead[0], cpu_overhead, rel_tol=0.05), prefix
+        assert math.isclose(overhead[1], ram_overhead, rel_tol=0.05), prefix
+
+
+def test_samples_without_active_pods_are_skipped():
+    cloud = make_cloud([500] * 10)
+    stats_service = StatsService(SimulatedStatsClient(cloud))
+    add_pods(cloud, models.ResourceType.VM, "m", 2, ready=False)
+    add_pods(cloud, models.ResourceType.DB, "m", 2, ready=False)
+
+    collect(cloud, stats_service, SimulatedResourceClient(cloud), 5)
+
+    assert all(item.count == 0 for item in stats_service.estimators.values())
+    assert not stats_service.is_overhead_calc
@@ -0,0 +1,38 @@
+import random
+
+from src.tools import tune
+
+
+def test_successive_halving_rounds_are_exact(monkeypatch):
+    budgets = []
+
+    def run_trials(pool, trace, prices, candidates, budget, fixed):
+        budgets.append((len(candidates), budget))
+        return [
+            tune.Trial(params, budget, float(index), 0.0)
+            for index, params in enumerate(candidates)
+        ]
+
+    monkeypatch.setattr(tune, "run_trials", run_trials)
+
+    trials = tune.successive_halving(None, [], [], random.Random(0), 27, {}, eta=3)
+    assert len(trials) == 27 + 9 + 3 + 1
+    assert budgets == [(27, 1 / 27), (9, 1 / 9), (3, 1 / 3), (1, 1.0)]
+
+    budgets.clear()
+    tune.successive_halving(None, [], [], random.Random(0), 1000, {}, eta=10)
+    assert budgets == [(1000, 1 / 1000), (100, 1 / 100), (10, 1 / 10), (1, 1.0)]
+
+
+def test_write_env_includes_fixed_overrides(tmp_path):
+    path = tmp_path / "tuned.env"
+
+    tune.write_env(
+        str(path), {**tune.FIXED, "forecast_models": ["naive"], "delta": 0.1234567}
+    )
+
+    lines = path.read_text().splitlines()
+    assert "ADAPTIVE_SLEEP=false" in lines
+    assert "PROD=true" in lines
+    assert 'FORECAST_MODELS=["naive"]' in lines
+    assert "DELTA=0.123457" in lines
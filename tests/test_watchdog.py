@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+from src import models
+from src.services import scheduler
+from src.services.mutation import MutationKind
+from src.services.watchdog import WatchdogService
+from src.settings import settings
+from tests.fakes import PRICES, add_pods, make_cloud, make_services
+
+
+def make_watchdog(services):
+    return WatchdogService(
+        stats_client=services.stats_client,
+        price_client=services.price_client,
+        resource_service=services.resource_service,
+        mutation_executor=services.mutation_executor,
+        fleet_state=services.fleet_state,
+        workers=services.workers,
+    )
+
+
+def test_watchdog_is_not_blocked_by_scheduler_planning():
+    cloud = make_cloud([1000] * 10)
+    add_pods(cloud, models.ResourceType.VM, "m", 2)
+    add_pods(cloud, models.ResourceType.DB, "l", 2)
+    services = make_services(cloud)
+    watchdog = make_watchdog(services)
+    watchdog.plans[models.ResourceType.VM] = [PRICES[0]]
+
+    async def warm_up():
+        for _ in range(settings.gap + 1):
+            await services.scheduler_service.task()
+            cloud.advance(cloud.step_second)
+
+    with settings.override(forecast_models=["naive"]):
+        asyncio.run(warm_up())
+
+    planning, locked = threading.Event(), []
+
+    def slow_plan(*args):
+        locked.append(services.fleet_state.lock.locked())
+        planning.set()
+        time.sleep(1)
+        return None
+
+    services.scheduler_service._plan_changes = slow_plan
+
+    async def main():
+        task = asyncio.create_task(services.scheduler_service.task())
+        while not planning.is_set() and not task.done():
+            await asyncio.sleep(0.01)
+
+        stat = await services.stats_client.get()
+        started_at = time.monotonic()
+        await watchdog._scale_up(models.ResourceType.VM, stat)
+        elapsed = time.monotonic() - started_at
+        await task
+        return elapsed
+
+    try:
+        elapsed = asyncio.run(main())
+    finally:
+        services.workers.shutdown()
+
+    assert locked and not any(locked)
+    assert elapsed < 0.5
+    assert [
+        item.mutation.kind
+        for item in services.fleet_state.in_flight(models.ResourceType.VM)
+    ] == [MutationKind.CREATE]
+
+
+def test_watchdog_skips_when_create_is_in_flight():
+    cloud = make_cloud([1000] * 10)
+    add_pods(cloud, models.ResourceType.VM, "m", 1)
+    services = make_services(cloud)
+    watchdog = make_watchdog(services)
+    watchdog.plans[models.ResourceType.VM] = [PRICES[0]]
+
+    async def main():
+        stat = await services.stats_client.get()
+        await watchdog._scale_up(models.ResourceType.VM, stat)
+        await watchdog._scale_up(models.ResourceType.VM, stat)
+
+    try:
+        asyncio.run(main())
+    finally:
+        services.workers.shutdown()
+
+    assert len(cloud.pods) == 2
+
+
+def test_scheduler_skips_plan_when_fleet_changed_during_planning():
+    cloud = make_cloud([1000] * 10)
+    add_pods(cloud, models.ResourceType.VM, "m", 2)
+    add_pods(cloud, models.ResourceType.DB, "l", 2)
+    services = make_services(cloud)
+
+    async def warm_up():
+        for _ in range(settings.gap + 1):
+            await services.scheduler_service.task()
+            cloud.advance(cloud.step_second)
+
+    with settings.override(forecast_models=["naive"]):
+        asyncio.run(warm_up())
+
+    planned = []
+
+    def plan_and_resize(resource_type, pods, *args):
+        planned.append(resource_type)
+        pod = pods[0]
+        services.fleet_state.pods[pod.id] = pod.copy(update={"cpu": pod.cpu * 2})
+        return scheduler.Plan([], [], [pod.id], 0, 0)
+
+    services.scheduler_service._plan_changes = plan_and_resize
+    pod_count = len(cloud.pods)
+    operations = list(services.fleet_state.operations)
+    try:
+        asyncio.run(services.scheduler_service.task())
+    finally:
+        services.workers.shutdown()
+
+    assert planned
+    assert len(cloud.pods) == pod_count
+    assert services.fleet_state.operations == operations